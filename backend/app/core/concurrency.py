@@ -0,0 +1,45 @@
+"""
+樂觀並行控制：version 欄位 + ETag / If-Match
+
+模型以 `version_id_col` 宣告版本欄位，ORM 更新時會送出
+`UPDATE ... SET version = version + 1 WHERE id = ? AND version = ?`，
+若期間已被他人修改則 commit 時拋出 StaleDataError，轉為 412 回應。
+"""
+from fastapi import HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def set_etag(response: Response, version: int) -> None:
+    response.headers["ETag"] = etag(version)
+
+
+def _precondition_failed() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="資料已被其他人修改，請重新載入後再試",
+    )
+
+
+def check_if_match(if_match: str | None, current_version: int) -> None:
+    """If-Match 與目前版本不符時回 412；未帶或為 * 則略過"""
+    if not if_match or if_match.strip() == "*":
+        return
+    candidates = {
+        tag.strip().removeprefix("W/").strip('"') for tag in if_match.split(",")
+    }
+    if str(current_version) not in candidates:
+        raise _precondition_failed()
+
+
+async def commit_versioned(db: AsyncSession) -> None:
+    """commit；版本衝突（並行寫入）時回滾並回 412"""
+    try:
+        await db.commit()
+    except StaleDataError:
+        await db.rollback()
+        raise _precondition_failed()
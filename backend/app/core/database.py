@@ -1,6 +1,11 @@
+from sqlalchemy import Uuid, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import StaticPool
 
+from app.core import slow_queries
 from app.core.config import settings
 
 
@@ -8,13 +13,68 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-)
+# 跨資料庫 UUID：PostgreSQL 使用原生 uuid 型別，其他資料庫以 CHAR(32) 儲存
+UUID = Uuid
+
+
+def upsert(session: AsyncSession, model):
+    """支援 on_conflict_do_update / on_conflict_do_nothing 的 INSERT（兩種方言 API 相同）"""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def _sqlite_options(url) -> dict:
+    """SQLite（aiosqlite）：單一寫入者，WAL 讓讀取不被寫入阻擋"""
+    options = {"connect_args": {"timeout": settings.SQLITE_BUSY_TIMEOUT_SECONDS}}
+    if url.database in (None, "", ":memory:"):
+        # 記憶體資料庫只存在於單一連線中
+        options.update(poolclass=StaticPool)
+    else:
+        options.update(pool_size=settings.SQLITE_POOL_SIZE, max_overflow=0)
+    return options
+
+
+def _on_sqlite_connect(dbapi_conn, _record) -> None:
+    # 停用驅動自行管理的交易，改由 _on_sqlite_begin 送出 BEGIN，SAVEPOINT 才能正常運作
+    dbapi_conn.isolation_level = None
+    cursor = dbapi_conn.cursor()
+    for pragma in (
+        "journal_mode=WAL",
+        "synchronous=NORMAL",      # WAL 下仍保證一致性，只犧牲斷電時最後幾筆交易
+        "foreign_keys=ON",         # ON DELETE CASCADE / SET NULL 需要
+        f"cache_size=-{settings.SQLITE_CACHE_SIZE_MB * 1024}",
+        "temp_store=MEMORY",
+        f"mmap_size={settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}",
+    ):
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+
+def _on_sqlite_begin(conn) -> None:
+    conn.exec_driver_sql("BEGIN")
+
+
+def _create_engine():
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() == "sqlite":
+        sqlite_engine = create_async_engine(url, echo=False, **_sqlite_options(url))
+        event.listen(sqlite_engine.sync_engine, "connect", _on_sqlite_connect)
+        event.listen(sqlite_engine.sync_engine, "begin", _on_sqlite_begin)
+        return sqlite_engine
+    return create_async_engine(
+        url,
+        echo=False,
+        # 不使用 pool_pre_ping：閒置連線由 pool_health 於背景檢查
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_size=10,
+        max_overflow=20,
+    )
+
+
+engine = _create_engine()
+if slow_queries.is_enabled():
+    slow_queries.install(engine)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -25,6 +85,21 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+async def create_schema() -> None:
+    """建立資料表（正式環境由 gunicorn master 執行一次）"""
+    import app.models  # noqa: F401  註冊所有模型
+    from app.services.partitions import ensure_partitions
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await ensure_partitions(conn)
+
+
+async def dispose_engine() -> None:
+    """關閉連線池中的所有連線（graceful shutdown）"""
+    await engine.dispose()
+
+
 async def get_db() -> AsyncSession:          # type: ignore[override]
     async with AsyncSessionLocal() as session:
         try:
@@ -1,13 +1,16 @@
 """
 FastAPI Dependency：從 Authorization Header 取得並驗證目前使用者
 """
-from fastapi import Depends, HTTPException, status
+import secrets
+
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.core.security import decode_token
+from app.core.security import decode_token, subject_id
 from app.models.user import User
 
 bearer_scheme = HTTPBearer()
@@ -22,7 +25,7 @@ async def get_current_user(
     if payload.get("type") != "access":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="需要 Access Token")
 
-    user_id = payload.get("sub")
+    user_id = subject_id(payload)
     result  = await db.execute(select(User).where(User.id == user_id))
     user    = result.scalar_one_or_none()
 
@@ -30,3 +33,13 @@ async def get_current_user(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="使用者不存在或已停用")
 
     return user
+
+
+async def require_diagnostics_token(
+    token: str | None = Header(default=None, alias="X-Diagnostics-Token"),
+) -> None:
+    """診斷端點僅限管理者；未設定 DIAGNOSTICS_TOKEN 時視同不存在"""
+    if not settings.DIAGNOSTICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not token or not secrets.compare_digest(token, settings.DIAGNOSTICS_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="無權限")
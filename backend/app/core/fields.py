@@ -0,0 +1,29 @@
+"""
+Sparse fieldsets：解析 `fields=` 查詢參數，縮減 SQL 欄位投影與回應內容
+"""
+from typing import Any, Iterable
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def parse_fields(
+    fields: str | None,
+    schema: type[BaseModel],
+    always: Iterable[str] = ("id",),
+) -> list[str] | None:
+    """將 `fields=id,name,status` 轉為欄位清單；未指定時回傳 None（完整回應）"""
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in schema.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"未知的欄位：{', '.join(unknown)}")
+    return list(dict.fromkeys([*always, *requested]))
+
+
+def sparse_response(rows: list[dict[str, Any]]) -> JSONResponse:
+    """直接輸出精簡後的 dict 列表（略過完整 response_model 驗證）"""
+    return JSONResponse(content=jsonable_encoder(rows))
@@ -0,0 +1,274 @@
+"""
+Idempotency-Key 支援（ASGI middleware）
+
+同一使用者以相同 key 重送請求時：
+  - 第一次請求已完成 → 直接回放儲存的回應（含 ETag、Location 等標頭），不再執行路由
+  - 第一次請求仍在處理 → 等待其完成後回放（逾時回 409）
+  - 相同 key 但請求內容不同 → 422
+5xx 回應不保存，讓用戶端可以重試。
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import database
+from app.core.config import settings
+from app.core.security import decode_token
+from app.models.idempotency import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_ROUTES = [
+    ("POST", re.compile(r"^/api/v1/items$")),
+    ("POST", re.compile(r"^/api/v1/plans$")),
+    ("POST", re.compile(r"^/api/v1/plans/[^/]+/complete$")),
+    ("POST", re.compile(r"^/api/v1/plan-templates/[^/]+/instantiate$")),
+    ("POST", re.compile(r"^/api/v1/sync/batch$")),
+]
+
+_POLL_INTERVAL = 0.1
+# 回放時不沿用的標頭：長度依回放內容重算，cookie 不應重送
+_UNREPLAYED_HEADERS = {b"content-length", b"set-cookie"}
+
+
+def _is_idempotent_route(scope: Scope) -> bool:
+    method, path = scope["method"], scope["path"]
+    return any(m == method and p.match(path) for m, p in IDEMPOTENT_ROUTES)
+
+
+def _user_id(headers: Headers) -> str | None:
+    """只驗證 JWT 簽章取得 user id，不查 DB"""
+    auth = headers.get("authorization", "")
+    if not auth.lower().startswith("bearer "):
+        return None
+    try:
+        payload = decode_token(auth[7:])
+    except HTTPException:
+        return None
+    return payload.get("sub") if payload.get("type") == "access" else None
+
+
+async def _send_json(send: Send, status: int, content: dict) -> None:
+    body = json.dumps(content, ensure_ascii=False).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _claim(scoped_key: str, fingerprint: str) -> bool:
+    """嘗試建立 in-flight 紀錄；已存在時回傳 False
+
+    已過期（清理工作尚未刪除）或逾時未完成的紀錄可被接手，視同新的請求。
+    """
+    now = datetime.utcnow()
+    fresh = dict(
+        fingerprint=fingerprint,
+        created_at=now,
+        expires_at=now + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS),
+    )
+    async with database.engine.begin() as conn:
+        try:
+            async with conn.begin_nested():
+                await conn.execute(
+                    insert(IdempotencyKey).values(key=scoped_key, **fresh)
+                )
+            return True
+        except IntegrityError:
+            pass
+        stale = now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+        result = await conn.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.key == scoped_key,
+                or_(
+                    IdempotencyKey.expires_at <= now,
+                    # 前一次請求逾時未完成（程序中斷）：接手執行
+                    and_(
+                        IdempotencyKey.fingerprint == fingerprint,
+                        IdempotencyKey.status_code.is_(None),
+                        IdempotencyKey.created_at < stale,
+                    ),
+                ),
+            )
+            .values(
+                status_code=None,
+                content_type=None,
+                response_body=None,
+                response_headers=None,
+                **fresh,
+            )
+        )
+        return result.rowcount == 1
+
+
+async def _load(scoped_key: str):
+    async with database.engine.connect() as conn:
+        return (
+            await conn.execute(
+                select(
+                    IdempotencyKey.fingerprint,
+                    IdempotencyKey.status_code,
+                    IdempotencyKey.content_type,
+                    IdempotencyKey.response_headers,
+                    IdempotencyKey.response_body,
+                ).where(
+                    IdempotencyKey.key == scoped_key,
+                    IdempotencyKey.expires_at > datetime.utcnow(),
+                )
+            )
+        ).one_or_none()
+
+
+async def _wait_for_completion(scoped_key: str):
+    deadline = asyncio.get_running_loop().time() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        record = await _load(scoped_key)
+        if record is None or record.status_code is not None:
+            return record
+        if asyncio.get_running_loop().time() >= deadline:
+            return record
+        await asyncio.sleep(_POLL_INTERVAL)
+
+
+async def _store(
+    scoped_key: str, status: int, raw_headers: list[tuple[bytes, bytes]], body: bytes
+):
+    headers = [
+        [name.decode("latin-1"), value.decode("latin-1")]
+        for name, value in raw_headers
+        if name.lower() not in _UNREPLAYED_HEADERS
+    ]
+    async with database.engine.begin() as conn:
+        await conn.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == scoped_key)
+            .values(
+                status_code=status,
+                content_type=Headers(raw=raw_headers).get("content-type"),
+                response_body=body,
+                response_headers=headers,
+            )
+        )
+
+
+def _replay_headers(record) -> list[tuple[bytes, bytes]]:
+    if record.response_headers is None:  # 舊紀錄只保存了 content-type
+        headers = [(b"content-type", record.content_type.encode())]
+    else:
+        headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in record.response_headers
+        ]
+    return [
+        *headers,
+        (b"content-length", str(len(record.response_body)).encode()),
+        (b"idempotent-replayed", b"true"),
+    ]
+
+
+async def _release(scoped_key: str):
+    async with database.engine.begin() as conn:
+        await conn.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.key == scoped_key)
+        )
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _is_idempotent_route(scope):
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        user_id = _user_id(headers) if key else None
+        if not key or not user_id:
+            return await self.app(scope, receive, send)
+        if len(key) > 200:
+            return await _send_json(send, 400, {"detail": "Idempotency-Key 過長"})
+
+        # 讀取完整 body 以計算指紋，之後重新餵給路由
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+        fingerprint = hashlib.sha256(
+            b"\0".join([scope["method"].encode(), scope["path"].encode(), body])
+        ).hexdigest()
+        scoped_key = f"{user_id}:{key}"
+
+        if not await _claim(scoped_key, fingerprint):
+            record = await _load(scoped_key)
+            if record is not None and record.fingerprint != fingerprint:
+                return await _send_json(
+                    send, 422, {"detail": "Idempotency-Key 已用於不同的請求內容"}
+                )
+            record = await _wait_for_completion(scoped_key)
+            if record is None:
+                return await _send_json(send, 409, {"detail": "請重新送出請求"})
+            if record.status_code is None:
+                return await _send_json(send, 409, {"detail": "相同請求仍在處理中"})
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": record.status_code,
+                    "headers": _replay_headers(record),
+                }
+            )
+            await send({"type": "http.response.body", "body": record.response_body})
+            return
+
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code, response_headers, response_chunks = 500, [], []
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status_code, response_headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response_chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            await asyncio.shield(_release(scoped_key))
+            raise
+
+        if status_code >= 500:
+            await _release(scoped_key)
+        else:
+            await _store(
+                scoped_key, status_code, response_headers, b"".join(response_chunks)
+            )
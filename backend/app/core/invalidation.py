@@ -0,0 +1,172 @@
+"""
+跨節點快取失效通知：PostgreSQL LISTEN/NOTIFY
+
+    # 註冊本機快取處理器
+    bus.register(InvalidationKind.user, lambda msg: user_cache.pop(msg.id, None))
+    # 於異動的交易中發佈（commit 後才會送出，rollback 則不送）
+    await publish(db, InvalidationKind.user, user.id)
+
+傳遞保證為 at-least-once：監聽連線中斷重連後，期間可能遺漏的訊息無法補送，
+因此會對所有處理器送出 kind=None 的 reset 訊息，要求清空整個快取。
+"""
+import asyncio
+import inspect
+import json
+import logging
+import os
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Awaitable, Callable
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import database
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+NODE_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class InvalidationKind(str, Enum):
+    user = "user"
+    group = "group"
+    item = "item"
+    plan = "plan"
+    share = "share"
+
+
+@dataclass(frozen=True)
+class InvalidationMessage:
+    kind: InvalidationKind | None   # None 表示 reset（清空全部）
+    id: str | None
+    origin: str | None = None       # 發佈節點
+
+    def encode(self) -> str:
+        return json.dumps({"k": self.kind.value, "id": self.id, "o": self.origin})
+
+    @classmethod
+    def decode(cls, payload: str) -> "InvalidationMessage":
+        data = json.loads(payload)
+        return cls(kind=InvalidationKind(data["k"]), id=data["id"], origin=data["o"])
+
+
+Handler = Callable[[InvalidationMessage], Awaitable[None] | None]
+
+
+class InvalidationBus:
+    RECONNECT_DELAY = 1.0
+    MAX_RECONNECT_DELAY = 30.0
+    HEALTH_INTERVAL = 10.0
+
+    def __init__(self):
+        self._handlers: dict[InvalidationKind, list[Handler]] = defaultdict(list)
+        self._task: asyncio.Task | None = None
+
+    def register(self, kind: InvalidationKind, handler: Handler) -> None:
+        self._handlers[kind].append(handler)
+
+    async def dispatch(self, msg: InvalidationMessage) -> None:
+        if msg.kind is None:
+            handlers = [h for hs in self._handlers.values() for h in hs]
+        else:
+            handlers = self._handlers.get(msg.kind, [])
+        for handler in handlers:
+            try:
+                result = handler(msg)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception(f"Invalidation handler failed: {msg}")
+
+    # ── 監聽 ─────────────────────────────────────────────────────────────
+    def start(self) -> None:
+        if self._task is None and database.engine.dialect.name == "postgresql":
+            self._task = asyncio.create_task(
+                self._listen_forever(), name="invalidation"
+            )
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _on_notify(self, _conn, _pid, _channel, payload: str) -> None:
+        try:
+            msg = InvalidationMessage.decode(payload)
+        except (ValueError, KeyError):
+            logger.warning(f"Malformed invalidation payload: {payload!r}")
+            return
+        asyncio.get_running_loop().create_task(self.dispatch(msg))
+
+    async def _listen_forever(self) -> None:
+        delay = self.RECONNECT_DELAY
+        connected_before = False
+        while True:
+            try:
+                async with database.engine.connect() as conn:
+                    raw = (await conn.get_raw_connection()).driver_connection
+                    await raw.add_listener(CHANNEL, self._on_notify)
+                    if connected_before:
+                        # 斷線期間可能遺漏訊息：要求所有快取清空
+                        await self.dispatch(InvalidationMessage(kind=None, id=None))
+                    connected_before = True
+                    delay = self.RECONNECT_DELAY
+                    logger.info("Invalidation bus listening")
+                    try:
+                        while not raw.is_closed():
+                            await asyncio.sleep(self.HEALTH_INTERVAL)
+                            await raw.execute("SELECT 1")
+                    finally:
+                        if not raw.is_closed():
+                            await raw.remove_listener(CHANNEL, self._on_notify)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Invalidation listener disconnected")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+
+
+bus = InvalidationBus()
+
+
+async def publish(db: AsyncSession, kind: InvalidationKind, obj_id) -> None:
+    """於目前交易中發佈失效訊息；僅在 commit 成功後送達各節點"""
+    msg = InvalidationMessage(kind=kind, id=str(obj_id), origin=NODE_ID)
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql":
+        await db.execute(select(func.pg_notify(CHANNEL, msg.encode())))
+        return
+
+    # 非 PostgreSQL（單節點）：暫存於 session，commit 後於本機派送；
+    # 先確保交易已開始，否則尚未執行任何語句時 rollback 不會觸發 after_rollback
+    await db.connection()
+    db.info.setdefault(_PENDING, []).append(msg)
+
+
+# ── 單節點派送：與 pg_notify 相同，只有 commit 成功的交易會送出 ───────────
+_PENDING = "pending_invalidations"
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        loop = asyncio.get_running_loop()
+        for msg in pending:
+            loop.create_task(bus.dispatch(msg))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
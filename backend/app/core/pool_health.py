@@ -0,0 +1,128 @@
+"""
+連線池健康檢查：取代 pool_pre_ping
+
+pool_pre_ping 在每次 checkout 都多一次 SELECT 1 往返。改為：
+  - 每個 worker 於背景每 DB_POOL_CHECK_INTERVAL_SECONDS 逐一 ping 閒置連線
+    （QueuePool 為 FIFO，依序取出再歸還 checkedin() 次即輪過每條閒置連線）
+  - 任何 ping 遇到斷線錯誤時，SQLAlchemy 會使整個連線池中較舊的連線失效，
+    failover 後下一次 checkout 自動建立新連線，請求不會拿到失效連線
+  - 連線超過 DB_POOL_RECYCLE_SECONDS 於 checkout 時重建（pool_recycle，不需往返）
+
+最近一次檢查結果快取於 state，/health 據此回應 readiness，不另查資料庫。
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolState:
+    healthy: bool = False
+    checked_at: float | None = None     # time.monotonic()
+    latency_ms: float | None = None
+    checked_connections: int = 0
+    error: str | None = None
+
+
+class PoolHealthChecker:
+    def __init__(self, engine: AsyncEngine):
+        self._engine = engine
+        self._task: asyncio.Task | None = None
+        self.state = PoolState()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="pool-health")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _pool_status(self) -> dict:
+        pool = self._engine.pool
+        status = {"class": type(pool).__name__}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            if hasattr(pool, name):
+                status[name] = getattr(pool, name)()
+        return status
+
+    async def _ping(self) -> None:
+        async with self._engine.connect() as conn:
+            await conn.exec_driver_sql("SELECT 1")
+
+    async def check(self) -> PoolState:
+        """ping 每條閒置連線；至少 ping 一次，閒置為零時仍能反映資料庫是否可達"""
+        idle = self._pool_status().get("checkedin", 1)
+        started = time.perf_counter()
+        checked = 0
+        try:
+            for _ in range(max(idle, 1)):
+                await self._ping()
+                checked += 1
+        except Exception as exc:
+            if self.state.healthy:
+                logger.error(f"Database pool unhealthy: {exc}")
+            self.state = PoolState(
+                healthy=False,
+                checked_at=time.monotonic(),
+                checked_connections=checked,
+                error=f"{type(exc).__name__}: {exc}",
+            )
+            return self.state
+
+        if not self.state.healthy and self.state.checked_at is not None:
+            logger.info("Database pool healthy again")
+        self.state = PoolState(
+            healthy=True,
+            checked_at=time.monotonic(),
+            latency_ms=(time.perf_counter() - started) * 1000 / checked,
+            checked_connections=checked,
+        )
+        return self.state
+
+    async def _run(self) -> None:
+        # 啟動時已由 on_startup 完成第一次檢查
+        while True:
+            await asyncio.sleep(settings.DB_POOL_CHECK_INTERVAL_SECONDS)
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Pool health check error")
+
+    def is_ready(self) -> bool:
+        """最近一次檢查成功且未過期（超過 3 個週期未更新視為檢查卡住）"""
+        state = self.state
+        if not state.healthy or state.checked_at is None:
+            return False
+        max_age = settings.DB_POOL_CHECK_INTERVAL_SECONDS * 3
+        return time.monotonic() - state.checked_at <= max_age
+
+    def report(self) -> dict:
+        state = self.state
+        age = None if state.checked_at is None else time.monotonic() - state.checked_at
+        return {
+            "status": "ok" if self.is_ready() else "unavailable",
+            "database": {
+                "healthy": state.healthy,
+                "checked_seconds_ago": None if age is None else round(age, 1),
+                "latency_ms": state.latency_ms and round(state.latency_ms, 2),
+                "checked_connections": state.checked_connections,
+                "error": state.error,
+            },
+            "pool": self._pool_status(),
+        }
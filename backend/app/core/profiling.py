@@ -0,0 +1,192 @@
+"""
+單一請求的效能分析（ASGI middleware）
+
+觸發方式（皆未設定時 main.py 不安裝此 middleware，無任何額外開銷）：
+  - 請求帶 `X-Profile: <PROFILING_TOKEN>`（僅管理者持有此 token）
+  - 依 PROFILING_SAMPLE_RATE 隨機抽樣
+
+模式（PROFILING_MODE）：
+  sample   — 每 PROFILING_INTERVAL_MS 取樣一次目前 task 的 await 鏈（wall-clock），
+             等待 DB 等 I/O 的時間也會出現在堆疊中；輸出 folded stacks（.folded），
+             可直接餵給 flamegraph.pl / speedscope
+  cprofile — cProfile（CPU 時間，含同一執行緒上其他並行請求），輸出 .prof；
+             同一行程同時只能有一個 profiler（3.12 起重複 enable 會拋出
+             ValueError），已有請求在分析時其餘請求照常處理、不分析
+
+回應帶 `X-Profile-Id` 標頭，對應 PROFILING_DIR 中的檔名。
+"""
+import asyncio
+import cProfile
+import logging
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_cprofile_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return bool(settings.PROFILING_TOKEN) or settings.PROFILING_SAMPLE_RATE > 0
+
+
+def _frame_of(coro):
+    return getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+
+
+def _is_coroutine(obj) -> bool:
+    return hasattr(obj, "cr_frame") or hasattr(obj, "gi_frame")
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class TaskSampler:
+    """於背景執行緒定期取樣指定 task 的邏輯堆疊"""
+
+    def __init__(self, task: asyncio.Task, interval: float):
+        self._task = task
+        self._interval = interval
+        self._thread_id = threading.get_ident()  # 事件迴圈所在執行緒
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.stacks: Counter[str] = Counter()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                stack = self._sample()
+            except Exception:  # 取樣期間 frame 可能已結束，略過該次
+                continue
+            if stack:
+                self.stacks[";".join(stack)] += 1
+
+    def _sample(self) -> list[str]:
+        stack, coro = [], self._task.get_coro()
+        innermost = None
+        while coro is not None:
+            frame = _frame_of(coro)
+            if frame is None:
+                break
+            stack.append(_label(frame))
+            innermost = coro
+            awaited = getattr(coro, "cr_await", None) or getattr(
+                coro, "gi_yieldfrom", None
+            )
+            if awaited is not None and not _is_coroutine(awaited):
+                # 等待 Future：socket I/O、DB 回應、sleep 等，上層 frame 即等待位置
+                stack.append("<await>")
+                return stack
+            coro = awaited
+
+        if innermost is not None and getattr(innermost, "cr_running", False):
+            # task 正在執行：補上最內層協程之下的同步呼叫
+            frame = sys._current_frames().get(self._thread_id)
+            sync_frames = []
+            while frame is not None and frame is not innermost.cr_frame:
+                sync_frames.append(_label(frame))
+                frame = frame.f_back
+            if frame is not None:
+                stack.extend(reversed(sync_frames))
+        return stack
+
+
+def _profile_path(scope: Scope, profile_id: str, ext: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_")[:80] or "root"
+    name = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{scope['method']}-{slug}-{profile_id}"
+    return os.path.join(settings.PROFILING_DIR, f"{name}.{ext}")
+
+
+def _write_folded(path: str, stacks: Counter) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def _write_cprofile(path: str, profile: cProfile.Profile) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    profile.dump_stats(path)
+
+
+class ProfilerMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _should_profile(self, scope: Scope) -> bool:
+        token = settings.PROFILING_TOKEN
+        if token:
+            header = Headers(scope=scope).get("x-profile")
+            if header and secrets.compare_digest(header, token):
+                return True
+        rate = settings.PROFILING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            return await self.app(scope, receive, send)
+        if settings.PROFILING_MODE == "cprofile":
+            if not _cprofile_lock.acquire(blocking=False):
+                logger.info(f"Profiler busy, skipped {scope['method']} {scope['path']}")
+                return await self.app(scope, receive, send)
+            try:
+                return await self._profile(scope, receive, send)
+            finally:
+                _cprofile_lock.release()
+        return await self._profile(scope, receive, send)
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        profile_id = secrets.token_hex(4)
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        started = time.perf_counter()
+        if settings.PROFILING_MODE == "cprofile":
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                profile.disable()
+                path = _profile_path(scope, profile_id, "prof")
+                await asyncio.to_thread(_write_cprofile, path, profile)
+        else:
+            sampler = TaskSampler(
+                asyncio.current_task(), settings.PROFILING_INTERVAL_MS / 1000
+            )
+            sampler.start()
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                await asyncio.to_thread(sampler.stop)
+                path = _profile_path(scope, profile_id, "folded")
+                await asyncio.to_thread(_write_folded, path, sampler.stacks)
+
+        logger.info(
+            f"Profiled {scope['method']} {scope['path']} in "
+            f"{(time.perf_counter() - started) * 1000:.1f}ms -> {path}"
+        )
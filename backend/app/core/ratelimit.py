@@ -0,0 +1,180 @@
+"""
+Token bucket 限流：於路由依賴最前端執行，拒絕時不會進行密碼雜湊或一般 DB 查詢
+
+設定（見 Settings）：
+    RATE_LIMIT_LOGIN = "5/minute"   → 容量 5、每分鐘補滿
+後端：
+    memory   — 單一程序內的 LRU（預設），最多 MAX_KEYS 個 bucket
+    postgres — rate_limit_buckets 表，單一 UPSERT 完成補充與扣除，供多節點共用
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.security import decode_token
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(spec: str) -> tuple[float, float]:
+    """'10/minute' → (容量 10, 每秒補充 10/60)"""
+    count, _, period = spec.partition("/")
+    burst = float(count)
+    return burst, burst / _PERIODS[period.strip().rstrip("s")]
+
+
+class RateLimitBackend(Protocol):
+    async def hit(self, key: str, burst: float, rate: float) -> float | None:
+        """扣除一個 token；允許時回傳 None，拒絕時回傳建議等待秒數"""
+
+
+class MemoryBackend:
+    MAX_KEYS = 100_000
+
+    def __init__(self):
+        # key → (tokens, 更新時間, 補滿時間)，依最近使用排序（最舊者在前）
+        self._buckets: OrderedDict[str, tuple[float, float, float]] = OrderedDict()
+
+    def _evict(self, now: float) -> None:
+        """自最久未使用端移除已補滿（閒置）的 bucket；超過上限時也淘汰未補滿者
+
+        每次只檢查開頭幾筆，攤銷後為 O(1)，不因 key 數量增加而變慢。
+        """
+        while self._buckets:
+            key, (_, _, full_at) = next(iter(self._buckets.items()))
+            if full_at > now and len(self._buckets) <= self.MAX_KEYS:
+                break
+            del self._buckets[key]
+
+    async def hit(self, key: str, burst: float, rate: float) -> float | None:
+        now = time.monotonic()
+        tokens, ts, _ = self._buckets.get(key, (burst, now, now))
+        tokens = min(burst, tokens + (now - ts) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+        self._buckets.move_to_end(key)
+        self._evict(now)
+        return None if allowed else (1 - tokens) / rate
+
+
+class PostgresBackend:
+    _BURST = "CAST(:burst AS double precision)"
+    _REFILL = (
+        f"LEAST({_BURST}, b.tokens + "
+        "EXTRACT(EPOCH FROM (clock_timestamp() - b.updated_at)) "
+        "* CAST(:rate AS double precision))"
+    )
+    _SQL = text(
+        "INSERT INTO rate_limit_buckets AS b (key, tokens, allowed, updated_at) "
+        f"VALUES (:key, {_BURST} - 1, true, clock_timestamp()) "
+        "ON CONFLICT (key) DO UPDATE SET "
+        f"allowed = {_REFILL} >= 1, "
+        f"tokens = CASE WHEN {_REFILL} >= 1 THEN {_REFILL} - 1 ELSE {_REFILL} END, "
+        "updated_at = clock_timestamp() "
+        "RETURNING allowed, tokens"
+    )
+
+    async def hit(self, key: str, burst: float, rate: float) -> float | None:
+        from app.core.database import engine
+
+        async with engine.begin() as conn:
+            allowed, tokens = (
+                await conn.execute(
+                    self._SQL, {"key": key, "burst": burst, "rate": rate}
+                )
+            ).one()
+        return None if allowed else (1 - tokens) / rate
+
+
+_backends = {"memory": MemoryBackend, "postgres": PostgresBackend}
+_backend: RateLimitBackend | None = None
+
+
+def get_backend() -> RateLimitBackend:
+    global _backend
+    if _backend is None:
+        name = settings.RATE_LIMIT_BACKEND
+        if name == "postgres":
+            from app.core.database import engine
+
+            if engine.dialect.name != "postgresql":
+                # 單節點資料庫（如 SQLite）不需跨節點共用
+                logger.warning(
+                    "RATE_LIMIT_BACKEND=postgres requires PostgreSQL, using memory"
+                )
+                name = "memory"
+        _backend = _backends[name]()
+    return _backend
+
+
+# ── 識別 key ─────────────────────────────────────────────────────────────
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def _email_from_body(request: Request) -> str | None:
+    try:
+        body = await request.json()  # Starlette 會快取，路由仍可正常解析
+    except Exception:
+        return None
+    email = body.get("email") if isinstance(body, dict) else None
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+def _user_id_from_token(request: Request) -> str | None:
+    auth = request.headers.get("authorization", "")
+    if not auth.lower().startswith("bearer "):
+        return None
+    try:
+        return decode_token(auth[7:]).get("sub")  # 只驗簽，不查 DB
+    except HTTPException:
+        return None
+
+
+def rate_limit(route: str, *, by: tuple[str, ...] = ("ip",)):
+    """
+    建立限流依賴：`dependencies=[Depends(rate_limit("login", by=("ip", "email")))]`
+    by 可包含 ip / email / user，每種 key 各自計算 bucket。
+    """
+
+    async def dependency(request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        spec = getattr(settings, f"RATE_LIMIT_{route.upper()}", None)
+        if not spec:
+            return
+        burst, rate = parse_rate(spec)
+
+        keys = []
+        if "ip" in by:
+            keys.append(f"{route}:ip:{client_ip(request)}")
+        if "email" in by and (email := await _email_from_body(request)):
+            keys.append(f"{route}:email:{email}")
+        if "user" in by and (user_id := _user_id_from_token(request)):
+            keys.append(f"{route}:user:{user_id}")
+
+        backend = get_backend()
+        for key in keys:
+            retry_after = await backend.hit(key, burst, rate)
+            if retry_after is not None:
+                logger.debug(f"Rate limited: {key}")
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="請求過於頻繁，請稍後再試",
+                    headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+                )
+
+    return dependency
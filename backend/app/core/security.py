@@ -1,13 +1,27 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Any
+from uuid import UUID
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, status
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# jose / passlib(bcrypt) 延後到第一次使用時才載入，縮短冷啟動時間
+
+
+@lru_cache
+def _pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def warm_up() -> None:
+    """預先載入延遲匯入的模組（非 FAST_START 模式於啟動時呼叫）"""
+    import jose.jwt  # noqa: F401
+
+    _pwd_context()
 
 
 # ── 密碼 ──────────────────────────────────────────────────────────────────
@@ -17,15 +31,17 @@ def _truncate_password(plain: str) -> bytes:
 
 
 def hash_password(plain: str) -> str:
-    return pwd_context.hash(_truncate_password(plain))
+    return _pwd_context().hash(_truncate_password(plain))
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(_truncate_password(plain), hashed)
+    return _pwd_context().verify(_truncate_password(plain), hashed)
 
 
 # ── JWT ───────────────────────────────────────────────────────────────────
 def _build_token(data: dict[str, Any], expire_delta: timedelta) -> str:
+    from jose import jwt
+
     payload = data.copy()
     payload["exp"] = datetime.utcnow() + expire_delta
     return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
@@ -46,6 +62,8 @@ def create_refresh_token(user_id: str) -> str:
 
 
 def decode_token(token: str) -> dict[str, Any]:
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -57,3 +75,15 @@ def decode_token(token: str) -> dict[str, Any]:
             detail="Token 無效或已過期",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+def subject_id(payload: dict[str, Any]) -> UUID:
+    """取出 token 的 sub 並轉為 UUID（UUID 欄位不接受字串綁定），格式錯誤視同無效 token"""
+    try:
+        return UUID(str(payload.get("sub")))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token 無效或已過期",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
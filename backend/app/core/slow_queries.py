@@ -0,0 +1,228 @@
+"""
+慢查詢紀錄（掛在 engine 的 before/after_cursor_execute 事件上）
+
+超過 SLOW_QUERY_MS 的語句：
+  - 記錄耗時、參數形狀（只有型別與數量，不含值）與來源路由
+  - 依正規化後的語句指紋彙總次數 / 總耗時 / 最大耗時，見 report()
+  - PostgreSQL 上依 SLOW_QUERY_EXPLAIN_SAMPLE_RATE 抽樣，於背景以獨立連線執行
+    `EXPLAIN (ANALYZE, BUFFERS)`（僅 SELECT，交易結束時 rollback）；
+    執行計畫的 Filter / Index Cond 會帶出實際參數值，report() 僅供管理者讀取
+
+來源路由由 QueryContextMiddleware 放入 ContextVar；SLOW_QUERY_MS = 0 時兩者皆不安裝。
+"""
+import asyncio
+import hashlib
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from collections import Counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MAX_FINGERPRINTS = 1000    # 彙總表上限，超過時淘汰總耗時最少者
+
+_current_scope: ContextVar[Scope | None] = ContextVar("query_scope", default=None)
+_explaining: ContextVar[bool] = ContextVar("slow_query_explaining", default=False)
+
+
+def is_enabled() -> bool:
+    return settings.SLOW_QUERY_MS > 0
+
+
+# ── 來源路由 ─────────────────────────────────────────────────────────────
+class QueryContextMiddleware:
+    """記下目前請求的 scope；路由比對後 scope 內才有 route，故於查詢時再取值"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
+
+
+def _route_label() -> str:
+    scope = _current_scope.get()
+    if scope is None:
+        return "-"  # 背景工作、啟動流程等
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope["path"]
+    return f"{scope['method']} {path}"
+
+
+# ── 指紋與參數形狀 ────────────────────────────────────────────────────────
+_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),                    # 字串常值
+    (re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+|\?"), "?"),  # 各驅動的佔位符
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),                 # 數字常值
+    # IN (?, ?, ...) 長度不同視為同一語句（asyncpg 會帶 ::型別 轉型）
+    (re.compile(r"\(\s*\?(?:::\w+)?(?:\s*,\s*\?(?:::\w+)?)*\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize(statement: str) -> str:
+    for pattern, repl in _LITERALS:
+        statement = pattern.sub(repl, statement)
+    return statement.strip()
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def _shape_of(params) -> str:
+    """依序列出參數型別，連續相同者合併：(UUID×200, str)"""
+    values = params.values() if isinstance(params, dict) else params or ()
+    runs: list[list] = []
+    for value in values:
+        name = type(value).__name__
+        if runs and runs[-1][0] == name:
+            runs[-1][1] += 1
+        else:
+            runs.append([name, 1])
+    return "(" + ", ".join(n if c == 1 else f"{n}×{c}" for n, c in runs) + ")"
+
+
+def param_shape(params, executemany: bool) -> str:
+    if executemany and params:
+        return f"{len(params)}×{_shape_of(params[0])}"
+    return _shape_of(params)
+
+
+# ── 彙總 ─────────────────────────────────────────────────────────────────
+@dataclass
+class QueryStats:
+    statement: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    routes: Counter = field(default_factory=Counter)
+    plan: str | None = None
+    explained_at: float = 0.0
+
+    def add(self, elapsed_ms: float, route: str) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.routes[route] += 1
+
+
+_stats: dict[str, QueryStats] = {}
+
+
+def _record(normalized: str, elapsed_ms: float, route: str) -> tuple[str, QueryStats]:
+    key = fingerprint(normalized)
+    stats = _stats.get(key)
+    if stats is None:
+        if len(_stats) >= _MAX_FINGERPRINTS:
+            del _stats[min(_stats, key=lambda k: _stats[k].total_ms)]
+        stats = _stats[key] = QueryStats(statement=normalized)
+    stats.add(elapsed_ms, route)
+    return key, stats
+
+
+def report(top: int = 20) -> list[dict]:
+    """本 worker 的慢查詢，依總耗時排序"""
+    ranked = sorted(_stats.items(), key=lambda kv: kv[1].total_ms, reverse=True)
+    return [
+        {
+            "fingerprint": key,
+            "statement": s.statement,
+            "count": s.count,
+            "total_ms": round(s.total_ms, 1),
+            "mean_ms": round(s.total_ms / s.count, 1),
+            "max_ms": round(s.max_ms, 1),
+            "routes": dict(s.routes.most_common(5)),
+            "plan": s.plan,
+        }
+        for key, s in ranked[:top]
+    ]
+
+
+# ── EXPLAIN（背景執行）────────────────────────────────────────────────────
+_explain_tasks: set[asyncio.Task] = set()
+
+
+def _explainable(statement: str) -> bool:
+    """EXPLAIN ANALYZE 會實際執行語句，只允許不加鎖的 SELECT"""
+    head = statement.lstrip().upper()
+    return head.startswith("SELECT") and " FOR UPDATE" not in head
+
+
+async def _explain(engine: AsyncEngine, key: str, statement: str, params) -> None:
+    _explaining.set(True)  # 本 task 內的查詢不再記錄
+    try:
+        timeout_ms = int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, BUFFERS) {statement}", params
+            )
+            plan = "\n".join(row[0] for row in result)
+            await conn.rollback()
+    except Exception as exc:
+        logger.warning(f"Slow query EXPLAIN failed [{key}]: {exc}")
+        return
+    if key in _stats:
+        _stats[key].plan = plan
+    logger.warning(f"Slow query plan [{key}]:\n{plan}")
+
+
+def _maybe_explain(
+    engine: AsyncEngine, key: str, stats: QueryStats, statement: str, params
+) -> None:
+    if (
+        engine.dialect.name != "postgresql"
+        or random.random() >= settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+        or not _explainable(statement)
+        or time.monotonic() - stats.explained_at
+        < settings.SLOW_QUERY_EXPLAIN_COOLDOWN_SECONDS
+    ):
+        return
+    stats.explained_at = time.monotonic()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # 同步情境（如 CLI）不做 EXPLAIN
+    task = loop.create_task(_explain(engine, key, statement, params))
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
+
+
+# ── 安裝 ─────────────────────────────────────────────────────────────────
+def install(engine: AsyncEngine) -> None:
+    threshold_ms = settings.SLOW_QUERY_MS
+
+    def before(conn, cursor, statement, params, context, executemany):
+        conn.info["slow_query_start"] = time.perf_counter()
+
+    def after(conn, cursor, statement, params, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["slow_query_start"]) * 1000
+        if elapsed_ms < threshold_ms or _explaining.get():
+            return
+        route = _route_label()
+        key, stats = _record(normalize(statement), elapsed_ms, route)
+        logger.warning(
+            f"Slow query [{key}] {elapsed_ms:.1f}ms route={route} "
+            f"params={param_shape(params, executemany)}: {stats.statement[:500]}"
+        )
+        if not executemany:
+            _maybe_explain(engine, key, stats, statement, params)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before)
+    event.listen(engine.sync_engine, "after_cursor_execute", after)
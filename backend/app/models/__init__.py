@@ -1,12 +1,33 @@
-from .user import User, Friendship, InvitationToken
+from .user import (
+    User,
+    Friendship,
+    InvitationToken,
+    FriendSuggestion,
+    FriendSuggestionQueue,
+)
 from .item import Item, ItemShare
 from .group import Group, GroupMember
-from .plan import ShoppingPlan, PlanItem, PurchaseRecord, PlanShare
+from .plan import (
+    ShoppingPlan,
+    PlanItem,
+    PurchaseRecord,
+    PurchaseRecordArchive,
+    PlanShare,
+    PlanTemplate,
+    PlanTemplateItem,
+)
+from .ratelimit import RateLimitBucket
+from .idempotency import IdempotencyKey
+from .suggestion import RepurchaseStat
+from .pricing import PriceStat
+from .visibility import UserVisibleItem, UserVisiblePlan
 
 __all__ = [
     "User",
     "Friendship",
     "InvitationToken",
+    "FriendSuggestion",
+    "FriendSuggestionQueue",
     "Item",
     "ItemShare",
     "Group",
@@ -14,5 +35,14 @@ __all__ = [
     "ShoppingPlan",
     "PlanItem",
     "PurchaseRecord",
+    "PurchaseRecordArchive",
     "PlanShare",
+    "PlanTemplate",
+    "PlanTemplateItem",
+    "RateLimitBucket",
+    "IdempotencyKey",
+    "RepurchaseStat",
+    "PriceStat",
+    "UserVisibleItem",
+    "UserVisiblePlan",
 ]
@@ -0,0 +1,19 @@
+"""
+IdempotencyKey 模型：保存首次回應供重送時回放
+"""
+from sqlalchemy import Column, String, Integer, LargeBinary, DateTime, JSON
+
+from app.core.database import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    key           = Column(String(255), primary_key=True)   # "{user_id}:{Idempotency-Key}"
+    fingerprint   = Column(String(64), nullable=False)      # sha256(method, path, body)
+    status_code   = Column(Integer, nullable=True)          # NULL 表示處理中
+    content_type  = Column(String(100), nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    response_headers = Column(JSON, nullable=True)  # [[name, value], ...]
+    created_at    = Column(DateTime, nullable=False)
+    expires_at    = Column(DateTime, nullable=False, index=True)
@@ -5,12 +5,12 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy import (
-    Column, String, Integer, Numeric, Text, DateTime, ForeignKey, Enum
+    Column, String, Integer, Numeric, Text, DateTime, ForeignKey, Enum, Index,
+    event, text,
 )
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
-from app.core.database import Base
+from app.core.database import Base, UUID
 
 import enum
 
@@ -33,6 +33,27 @@ class SharePermission(str, enum.Enum):
 
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = (
+        # 群組物品列表：WHERE group_id = ? AND status = ?
+        #   AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC
+        Index(
+            "ix_items_group_status_created_id", "group_id", "status", "created_at", "id"
+        ),
+        # 預設列表（services/item_archive.py 的 ITEM_ACTIVE 兩個分支各對應一個部分索引），
+        # 索引大小只隨未封存物品成長，不含歷史已購買物品
+        Index(
+            "ix_items_owner_active",
+            "owner_id",
+            postgresql_where=text("status <> 'purchased'"),
+            sqlite_where=text("status <> 'purchased'"),
+        ),
+        Index(
+            "ix_items_owner_purchased_unarchived",
+            "owner_id",
+            postgresql_where=text("status = 'purchased' AND archived_at IS NULL"),
+            sqlite_where=text("status = 'purchased' AND archived_at IS NULL"),
+        ),
+    )
 
     id           = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     owner_id     = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -49,12 +70,23 @@ class Item(Base):
 
     created_at   = Column(DateTime, default=datetime.utcnow)
     updated_at   = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version      = Column(Integer, nullable=False, server_default="1")   # 樂觀鎖版本
+    archived_at  = Column(DateTime, nullable=True)   # 已購買超過保留期後封存
 
     owner        = relationship("User", back_populates="items")
     group        = relationship("Group", back_populates="items")
     shares       = relationship("ItemShare", back_populates="item", cascade="all, delete-orphan")
     plan_items   = relationship("PlanItem", back_populates="item")
 
+    __mapper_args__ = {"version_id_col": version}
+
+
+@event.listens_for(Item.status, "set")
+def _unarchive_on_status_change(target, value, oldvalue, initiator):
+    """狀態變更（例如再次加入計畫）即離開封存層"""
+    if value != oldvalue:
+        target.archived_at = None
+
 
 class ItemShare(Base):
     """將特定物品分享給好友"""
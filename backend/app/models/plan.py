@@ -1,5 +1,5 @@
 """
-ShoppingPlan / PlanItem / PurchaseRecord / PlanShare 模型
+ShoppingPlan / PlanItem / PurchaseRecord / PlanShare / PlanTemplate 模型
 """
 
 import uuid
@@ -16,11 +16,13 @@ from sqlalchemy import (
     ForeignKey,
     Enum,
     Text,
+    JSON,
+    Index,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
-from app.core.database import Base
+from app.core.database import Base, UUID
 import enum
 
 
@@ -36,6 +38,17 @@ class PlanSharePermission(str, enum.Enum):
 
 class ShoppingPlan(Base):
     __tablename__ = "shopping_plans"
+    __table_args__ = (
+        # 群組計畫列表：WHERE group_id = ? AND status = ?
+        #   AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC
+        Index(
+            "ix_shopping_plans_group_status_created_id",
+            "group_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(200), nullable=False)
@@ -49,6 +62,7 @@ class ShoppingPlan(Base):
     status = Column(Enum(PlanStatus), nullable=False, default=PlanStatus.ongoing)
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
+    version = Column(Integer, nullable=False, server_default="1")  # 樂觀鎖版本
 
     creator = relationship("User", back_populates="plans")
     group = relationship("Group", back_populates="plans")
@@ -62,6 +76,8 @@ class ShoppingPlan(Base):
         "PlanShare", back_populates="plan", cascade="all, delete-orphan"
     )
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 class PlanItem(Base):
     """購物計畫中包含的物品"""
@@ -78,15 +94,23 @@ class PlanItem(Base):
         UUID(as_uuid=True), ForeignKey("items.id", ondelete="CASCADE"), nullable=False
     )
     is_done = Column(Boolean, default=False)  # 購物時勾除
+    version = Column(Integer, nullable=False, server_default="1")  # 樂觀鎖版本
 
     plan = relationship("ShoppingPlan", back_populates="plan_items")
     item = relationship("Item", back_populates="plan_items")
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 class PurchaseRecord(Base):
-    """計畫完成後自動轉存的購買紀錄"""
+    """
+    計畫完成後自動轉存的購買紀錄
+    PostgreSQL 上依 purchased_at 按月分區（見 app/services/partitions.py），
+    分區鍵必須包含於主鍵中。
+    """
 
     __tablename__ = "purchase_records"
+    __table_args__ = {"postgresql_partition_by": "RANGE (purchased_at)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     plan_id = Column(
@@ -99,11 +123,34 @@ class PurchaseRecord(Base):
     actual_price = Column(Numeric(10, 2), nullable=True)  # 實際購買價格
     category = Column(String(50), nullable=True)
     note = Column(Text, nullable=True)
-    purchased_at = Column(DateTime, default=datetime.utcnow)
+    purchased_at = Column(
+        DateTime, primary_key=True, default=datetime.utcnow, index=True
+    )
 
     plan = relationship("ShoppingPlan", back_populates="records")
 
 
+class PurchaseRecordArchive(Base):
+    """
+    封存層：超過保留期的月分區以「每計畫每月一列」的 JSON 陣列保存，
+    大型欄位由 TOAST 自動壓縮。
+    """
+
+    __tablename__ = "purchase_record_archives"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    plan_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("shopping_plans.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    month = Column(Date, nullable=False)  # 分區月份（每月 1 日）
+    record_count = Column(Integer, nullable=False)
+    records = Column(JSON().with_variant(JSONB, "postgresql"), nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+
 class PlanShare(Base):
     """將購物計畫分享給好友"""
 
@@ -125,3 +172,57 @@ class PlanShare(Base):
 
     plan = relationship("ShoppingPlan", back_populates="shares")
     user = relationship("User")
+
+
+class PlanTemplate(Base):
+    """
+    計畫範本：由既有計畫儲存，可一次產生新計畫（services/plan_templates.py）。
+    設定 recurrence_days 時由背景工作於 next_run_on 到期時自動產生。
+    """
+
+    __tablename__ = "plan_templates"
+    __table_args__ = (
+        # 週期計畫掃描：WHERE next_run_on <= today
+        Index("ix_plan_templates_next_run_on", "next_run_on"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String(200), nullable=False)
+    creator_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    group_id = Column(
+        UUID(as_uuid=True), ForeignKey("groups.id", ondelete="SET NULL"), nullable=True
+    )
+    recurrence_days = Column(Integer, nullable=True)  # 週期天數，None = 不重複
+    next_run_on = Column(Date, nullable=True)  # 下次自動產生計畫的日期
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    template_items = relationship(
+        "PlanTemplateItem",
+        back_populates="template",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+
+class PlanTemplateItem(Base):
+    """範本包含的物品（產生計畫時複製為 PlanItem）"""
+
+    __tablename__ = "plan_template_items"
+
+    template_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("plan_templates.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    item_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("items.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    template = relationship("PlanTemplate", back_populates="template_items")
@@ -0,0 +1,20 @@
+"""
+PriceStat 模型：依實際購買價格增量維護的價格統計
+"""
+from sqlalchemy import Column, String, Integer, Numeric, DateTime
+
+from app.core.database import Base, UUID
+
+
+class PriceStat(Base):
+    """每個範圍（使用者 / 群組）× 正規化物品名稱 一列，以主鍵直接查詢"""
+    __tablename__ = "price_stats"
+
+    scope_type   = Column(String(8), primary_key=True)             # user | group
+    scope_id     = Column(UUID(as_uuid=True), primary_key=True)
+    name_key     = Column(String(200), primary_key=True)           # 正規化名稱
+    count        = Column(Integer, nullable=False, default=0)
+    mean_price   = Column(Numeric(12, 4), nullable=False)          # 累計平均
+    median_price = Column(Numeric(12, 4), nullable=False)          # 串流近似中位數
+    last_price   = Column(Numeric(10, 2), nullable=False)
+    updated_at   = Column(DateTime, nullable=False)
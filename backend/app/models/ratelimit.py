@@ -0,0 +1,15 @@
+"""
+RateLimitBucket 模型（postgres 限流後端使用）
+"""
+from sqlalchemy import Column, String, Float, Boolean, DateTime
+
+from app.core.database import Base
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    key        = Column(String(320), primary_key=True)   # route:類型:值
+    tokens     = Column(Float, nullable=False)
+    allowed    = Column(Boolean, nullable=False, default=True)
+    updated_at = Column(DateTime, nullable=False)
@@ -0,0 +1,25 @@
+"""
+RepurchaseStat 模型：依購買紀錄增量維護的回購週期
+"""
+from sqlalchemy import Column, String, Integer, Float, DateTime, Index
+
+from app.core.database import Base, UUID
+
+
+class RepurchaseStat(Base):
+    """每個範圍（使用者 / 群組）× 正規化物品名稱 一列"""
+    __tablename__ = "repurchase_stats"
+    __table_args__ = (
+        Index("ix_repurchase_stats_scope_due", "scope_type", "scope_id", "next_due_at"),
+    )
+
+    scope_type    = Column(String(8), primary_key=True)            # user | group
+    scope_id      = Column(UUID(as_uuid=True), primary_key=True)
+    name_key      = Column(String(200), primary_key=True)          # 正規化名稱
+    display_name  = Column(String(200), nullable=False)            # 最近一次的原始名稱
+    category      = Column(String(50), nullable=True)
+    last_quantity = Column(Integer, nullable=False, default=1)
+    purchase_count    = Column(Integer, nullable=False, default=0)
+    avg_interval_days = Column(Float, nullable=True)               # EWMA 回購間隔
+    last_purchased_at = Column(DateTime, nullable=False)
+    next_due_at       = Column(DateTime, nullable=True)            # 預估下次購買時間
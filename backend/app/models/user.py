@@ -1,21 +1,25 @@
 """
-User / Friendship / InvitationToken 模型
+User / Friendship / InvitationToken / FriendSuggestion 模型
 """
 import uuid
 from datetime import datetime
 
 from sqlalchemy import (
-    Column, String, Boolean, DateTime, ForeignKey, Enum, Text
+    Column, String, Boolean, DateTime, ForeignKey, Enum, Text, Index,
+    Integer, BigInteger,
 )
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
-from app.core.database import Base
+from app.core.database import Base, UUID
 
 
 # ── 好友關係 (自關聯 M2M) ──────────────────────────────────────────────────
 class Friendship(Base):
     __tablename__ = "friendships"
+    __table_args__ = (
+        # 反方向查詢（addressee_id = ?）不必掃描整個主鍵
+        Index("ix_friendships_addressee", "addressee_id", "requester_id"),
+    )
 
     requester_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     addressee_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
@@ -60,13 +64,41 @@ class User(Base):
 # ── 邀請 Token ──────────────────────────────────────────────────────────
 class InvitationToken(Base):
     __tablename__ = "invitation_tokens"
+    __table_args__ = (
+        Index("ix_invitation_tokens_inviter_created", "inviter_id", "created_at"),
+    )
 
     id          = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     token       = Column(String(255), unique=True, nullable=False, index=True)
     inviter_id  = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     invitee_email = Column(String(255), nullable=False)
     is_used     = Column(Boolean, default=False)
-    expires_at  = Column(DateTime, nullable=False)
+    expires_at  = Column(DateTime, nullable=False, index=True)
     created_at  = Column(DateTime, default=datetime.utcnow)
 
     inviter = relationship("User", back_populates="invitations")
+
+
+# ── 好友推薦（背景預先計算）──────────────────────────────────────────────
+class FriendSuggestion(Base):
+    """每位使用者保留前 N 名推薦，依 rank 排序"""
+    __tablename__ = "friend_suggestions"
+    __table_args__ = (
+        Index("ix_friend_suggestions_user_rank", "user_id", "rank"),
+    )
+
+    user_id        = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    candidate_id   = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    rank           = Column(Integer, nullable=False)
+    mutual_friends = Column(Integer, nullable=False, default=0)
+    shared_groups  = Column(Integer, nullable=False, default=0)
+    refreshed_at   = Column(DateTime, nullable=False)
+
+
+class FriendSuggestionQueue(Base):
+    """待重新計算推薦的使用者（允許重複，處理時合併）"""
+    __tablename__ = "friend_suggestion_queue"
+
+    id        = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    user_id   = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    queued_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,35 @@
+"""
+UserVisibleItem / UserVisiblePlan 模型：寫入時展開的可見性表（fan-out-on-write）
+
+啟用 VISIBILITY_FANOUT_ENABLED 時，由 services/visibility.py 在異動共享、
+群組成員或擁有者的同一交易中維護；列表與權限檢查只需 user_id 的索引範圍掃描。
+"""
+from sqlalchemy import Column, String, ForeignKey, Index
+
+from app.core.database import Base, UUID
+
+
+class UserVisibleItem(Base):
+    """使用者 × 物品 × 可見原因 一列"""
+    __tablename__ = "user_visible_items"
+    __table_args__ = (
+        Index("ix_user_visible_items_item", "item_id"),
+    )
+
+    user_id    = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    item_id    = Column(UUID(as_uuid=True), ForeignKey("items.id", ondelete="CASCADE"), primary_key=True)
+    reason     = Column(String(8), primary_key=True)     # owner | share | group
+    permission = Column(String(8), nullable=False)       # view | edit
+
+
+class UserVisiblePlan(Base):
+    """使用者 × 計畫 × 可見原因 一列"""
+    __tablename__ = "user_visible_plans"
+    __table_args__ = (
+        Index("ix_user_visible_plans_plan", "plan_id"),
+    )
+
+    user_id    = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    plan_id    = Column(UUID(as_uuid=True), ForeignKey("shopping_plans.id", ondelete="CASCADE"), primary_key=True)
+    reason     = Column(String(8), primary_key=True)     # creator | share
+    permission = Column(String(8), nullable=False)       # view | edit
@@ -3,8 +3,13 @@ from .friends import router as friends_router
 from .items import router as items_router
 from .groups import router as groups_router
 from .plans import router as plans_router
+from .plan_templates import router as plan_templates_router
+from .records import router as records_router
+from .suggestions import router as suggestions_router
+from .sync import router as sync_router
 
 __all__ = [
     "auth_router", "friends_router", "items_router",
-    "groups_router", "plans_router",
+    "groups_router", "plans_router", "plan_templates_router", "records_router",
+    "suggestions_router", "sync_router",
 ]
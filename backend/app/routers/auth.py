@@ -14,8 +14,11 @@ from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
+    subject_id,
 )
 from app.core.deps import get_current_user
+from app.core.invalidation import InvalidationKind, publish
+from app.core.ratelimit import rate_limit
 from app.models.user import User, InvitationToken, Friendship
 from app.schemas import (
     UserCreate,
@@ -25,13 +28,19 @@ from app.schemas import (
     TokenResponse,
     RefreshRequest,
 )
+from app.services.friend_suggestions import mark_friendship_changed
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
-@router.post("/register", response_model=UserOut, status_code=201)
+@router.post(
+    "/register",
+    response_model=UserOut,
+    status_code=201,
+    dependencies=[Depends(rate_limit("register", by=("ip", "email")))],
+)
 async def register(body: UserCreate, db: AsyncSession = Depends(get_db)):
     logger.debug(f"Register attempt for email: {body.email}")
     # 檢查 Email 是否已存在
@@ -67,6 +76,7 @@ async def register(body: UserCreate, db: AsyncSession = Depends(get_db)):
                 db.add(Friendship(requester_id=inv.inviter_id, addressee_id=user.id))
                 db.add(Friendship(requester_id=user.id, addressee_id=inv.inviter_id))
                 inv.is_used = True
+                await mark_friendship_changed(db, inv.inviter_id, user.id)
                 logger.debug(
                     f"Invitation accepted: inviter_id={inv.inviter_id}, invitee_id={user.id}"
                 )
@@ -83,7 +93,11 @@ async def register(body: UserCreate, db: AsyncSession = Depends(get_db)):
     return user
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(rate_limit("login", by=("ip", "email")))],
+)
 async def login(body: UserLogin, db: AsyncSession = Depends(get_db)):
     logger.debug(f"Login attempt for email: {body.email}")
     result = await db.execute(select(User).where(User.email == body.email))
@@ -111,7 +125,7 @@ async def refresh_token(body: RefreshRequest, db: AsyncSession = Depends(get_db)
         logger.debug("Token refresh failed: not a refresh token")
         raise HTTPException(status_code=401, detail="需要 Refresh Token")
 
-    user_id = payload.get("sub")
+    user_id = subject_id(payload)
     logger.debug(f"Token refresh for user_id={user_id}")
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
@@ -145,6 +159,7 @@ async def update_me(
         current_user.name = body.name
     if body.password:
         current_user.hashed_pw = hash_password(body.password)
+    await publish(db, InvalidationKind.user, current_user.id)
     await db.commit()
     await db.refresh(current_user)
     logger.debug(f"Update me successful: user_id={current_user.id}")
@@ -4,17 +4,26 @@
 
 import secrets
 from datetime import datetime, timedelta
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_, and_
 
 from app.core.database import get_db
 from app.core.deps import get_current_user
+from app.core.invalidation import InvalidationKind, publish
 from app.core.config import settings
-from app.models.user import User, Friendship, InvitationToken
-from app.schemas import InvitationCreate, InvitationOut, FriendOut
+from app.core.ratelimit import rate_limit
+from app.models.user import User, Friendship, InvitationToken, FriendSuggestion
+from app.schemas import (
+    InvitationCreate,
+    InvitationOut,
+    FriendOut,
+    FriendSuggestionOut,
+)
 from app.services.email import send_invitation_email
+from app.services.friend_suggestions import mark_friendship_changed
 
 router = APIRouter(prefix="/friends", tags=["Friends & Invitations"])
 
@@ -44,10 +53,33 @@ async def list_friends(
     return result.scalars().all()
 
 
+# ── 好友推薦 ─────────────────────────────────────────────────────────────
+@router.get("/suggestions", response_model=list[FriendSuggestionOut])
+async def list_friend_suggestions(
+    limit: int = Query(default=20, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    me: User = Depends(get_current_user),
+):
+    """讀取背景預先計算的推薦（依共同好友數、共同群組數排名）"""
+    result = await db.execute(
+        select(
+            User.id,
+            User.name,
+            FriendSuggestion.mutual_friends,
+            FriendSuggestion.shared_groups,
+        )
+        .join(User, User.id == FriendSuggestion.candidate_id)
+        .where(FriendSuggestion.user_id == me.id, User.is_active.is_(True))
+        .order_by(FriendSuggestion.rank)
+        .limit(limit)
+    )
+    return [dict(row._mapping) for row in result]
+
+
 # ── 移除好友 ─────────────────────────────────────────────────────────────
 @router.delete("/{friend_id}", status_code=204)
 async def remove_friend(
-    friend_id: str,
+    friend_id: UUID,
     db: AsyncSession = Depends(get_db),
     me: User = Depends(get_current_user),
 ):
@@ -68,11 +100,20 @@ async def remove_friend(
     rows = result.scalars().all()
     for row in rows:
         await db.delete(row)
+    if rows:
+        await mark_friendship_changed(db, me.id, friend_id)
+    await publish(db, InvalidationKind.user, me.id)
+    await publish(db, InvalidationKind.user, friend_id)
     await db.commit()
 
 
 # ── 寄送邀請信 ───────────────────────────────────────────────────────────
-@router.post("/invite", response_model=InvitationOut, status_code=201)
+@router.post(
+    "/invite",
+    response_model=InvitationOut,
+    status_code=201,
+    dependencies=[Depends(rate_limit("invite", by=("ip", "user")))],
+)
 async def invite_friend(
     body: InvitationCreate,
     background_tasks: BackgroundTasks,
@@ -3,21 +3,42 @@ Group 路由：建立/管理群組與成員
 """
 
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, and_, tuple_
 from sqlalchemy.orm import selectinload
 
 from app.core.database import get_db
 from app.core.deps import get_current_user
+from app.core.invalidation import InvalidationKind, publish
+from app.core.fields import parse_fields, sparse_response
 from app.models.user import User
 from app.models.group import Group, GroupMember, GroupRole
+from app.models.item import Item, ItemStatus
+from app.models.plan import ShoppingPlan, PlanStatus
 from app.schemas import (
     GroupCreate,
     GroupUpdate,
     GroupOut,
     GroupMemberAdd,
     GroupMemberOut,
+    ItemOut,
+    PlanOut,
+)
+from app.services.pricing import estimate_prices
+from app.services.visibility import sync_items
+from app.services.item_archive import item_scope
+from app.services.friend_suggestions import mark_group_changed, mark_stale
+from app.services.reads import (
+    GROUP_COLUMNS,
+    ITEM_COLUMNS,
+    PLAN_COLUMNS,
+    GroupRow,
+    ItemRow,
+    PlanRow,
+    fetch_group_members,
+    fetch_plan_items,
 )
 
 router = APIRouter(prefix="/groups", tags=["Groups"])
@@ -73,17 +94,39 @@ async def create_group(
 
 @router.get("", response_model=list[GroupOut])
 async def list_groups(
+    fields: str | None = Query(
+        default=None, description="只回傳指定欄位，例如 id,name"
+    ),
     db: AsyncSession = Depends(get_db),
     me: User = Depends(get_current_user),
 ):
-    result = await db.execute(
-        select(Group)
-        .options(selectinload(Group.members).selectinload(GroupMember.user))
-        .join(GroupMember)
-        .where(GroupMember.user_id == me.id)
-    )
-    groups = result.scalars().all()
-    return [_group_to_dict(g) for g in groups]
+    selected = parse_fields(fields, GroupOut)
+    if selected is None:
+        # Core 欄位查詢 + 單次成員 JOIN，不建立 ORM 實體
+        rows = (
+            await db.execute(
+                select(*GROUP_COLUMNS)
+                .join(GroupMember)
+                .where(GroupMember.user_id == me.id)
+            )
+        ).all()
+        members = await fetch_group_members(db, [row.id for row in rows])
+        return [GroupRow(*row, members=members.get(row.id, ())) for row in rows]
+
+    columns = [getattr(Group, f) for f in selected if f != "members"]
+    rows = [
+        dict(row._mapping)
+        for row in await db.execute(
+            select(*columns).join(GroupMember).where(GroupMember.user_id == me.id)
+        )
+    ]
+
+    # 需要 members 時以單次 JOIN 補上成員與名稱
+    if "members" in selected and rows:
+        members = await fetch_group_members(db, [row["id"] for row in rows])
+        for row in rows:
+            row["members"] = [m._asdict() for m in members.get(row["id"], ())]
+    return sparse_response(rows)
 
 
 @router.get("/{group_id}", response_model=GroupOut)
@@ -109,6 +152,7 @@ async def update_group(
         raise HTTPException(status_code=403, detail="只有建立者可修改群組")
     if body.name:
         group.name = body.name
+    await publish(db, InvalidationKind.group, group_id)
     await db.commit()
     # Re-fetch with members loaded
     group = await _get_group_or_404(group_id, db)
@@ -124,7 +168,18 @@ async def delete_group(
     group = await _get_group_or_404(group_id, db)
     if group.creator_id != me.id:
         raise HTTPException(status_code=403, detail="只有建立者可刪除群組")
+    # 群組物品的 group_id 會被設為 NULL，刪除前先記下以便重新展開可見性
+    item_ids = (
+        (await db.execute(select(Item.id).where(Item.group_id == group_id)))
+        .scalars()
+        .all()
+    )
+    member_ids = [m.user_id for m in group.members]
     await db.delete(group)
+    await mark_stale(db, member_ids)
+    if item_ids:
+        await sync_items(db, Item.id.in_(item_ids))
+    await publish(db, InvalidationKind.group, group_id)
     await db.commit()
 
 
@@ -152,6 +207,9 @@ async def add_member(
 
     member = GroupMember(group_id=group_id, user_id=body.user_id, role=body.role)
     db.add(member)
+    await sync_items(db, Item.group_id == group_id)
+    await mark_group_changed(db, group_id)
+    await publish(db, InvalidationKind.group, group_id)
     await db.commit()
     # Refresh with user loaded
     result = await db.execute(
@@ -202,9 +260,97 @@ async def remove_member(
     if not member:
         raise HTTPException(status_code=404, detail="成員不存在")
     await db.delete(member)
+    await sync_items(db, Item.group_id == group_id)
+    await mark_group_changed(db, group_id, user_id)
+    await publish(db, InvalidationKind.group, group_id)
     await db.commit()
 
 
+# ── 群組物品 / 計畫 ──────────────────────────────────────────────────────
+async def _assert_member_by_id(group_id: UUID, me: User, db: AsyncSession):
+    """單次查詢確認群組存在且使用者為成員或建立者（不載入成員清單）"""
+    row = (
+        await db.execute(
+            select(Group.creator_id, GroupMember.user_id)
+            .outerjoin(
+                GroupMember,
+                and_(GroupMember.group_id == Group.id, GroupMember.user_id == me.id),
+            )
+            .where(Group.id == group_id)
+        )
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="群組不存在")
+    if row.user_id is None and row.creator_id != me.id:
+        raise HTTPException(status_code=403, detail="非群組成員")
+
+
+def _keyset_page(stmt, model, before, before_id, limit: int):
+    """(created_at, id) 複合游標：同一時間戳的多筆（如批次匯入）不會被跳過"""
+    if before is not None:
+        if before_id is None:
+            raise HTTPException(status_code=422, detail="before 與 before_id 需同時提供")
+        stmt = stmt.where(tuple_(model.created_at, model.id) < (before, before_id))
+    return stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+
+
+@router.get("/{group_id}/items", response_model=list[ItemOut])
+async def list_group_items(
+    group_id: UUID,
+    status: ItemStatus | None = Query(default=None),
+    archived: bool = Query(default=False, description="true 時只列出已封存的物品"),
+    before: datetime | None = Query(
+        default=None, description="分頁游標：上一頁最後一筆的 created_at"
+    ),
+    before_id: UUID | None = Query(
+        default=None, description="分頁游標：上一頁最後一筆的 id"
+    ),
+    limit: int = Query(default=50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    me: User = Depends(get_current_user),
+):
+    """依 (group_id, status, created_at, id) 索引由新到舊分頁（預設不含已封存）"""
+    await _assert_member_by_id(group_id, me, db)
+    stmt = select(*ITEM_COLUMNS).where(Item.group_id == group_id, item_scope(archived))
+    if status is not None:
+        stmt = stmt.where(Item.status == status)
+    rows = (
+        await db.execute(_keyset_page(stmt, Item, before, before_id, limit))
+    ).all()
+    estimates = await estimate_prices(db, rows)
+    return [
+        ItemRow.from_row(row, price_estimate=estimates.get(row.id)) for row in rows
+    ]
+
+
+@router.get("/{group_id}/plans", response_model=list[PlanOut])
+async def list_group_plans(
+    group_id: UUID,
+    status: PlanStatus | None = Query(default=None),
+    before: datetime | None = Query(
+        default=None, description="分頁游標：上一頁最後一筆的 created_at"
+    ),
+    before_id: UUID | None = Query(
+        default=None, description="分頁游標：上一頁最後一筆的 id"
+    ),
+    limit: int = Query(default=50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    me: User = Depends(get_current_user),
+):
+    """依 (group_id, status, created_at, id) 索引由新到舊分頁"""
+    await _assert_member_by_id(group_id, me, db)
+    stmt = select(*PLAN_COLUMNS).where(ShoppingPlan.group_id == group_id)
+    if status is not None:
+        stmt = stmt.where(ShoppingPlan.status == status)
+    rows = (
+        await db.execute(_keyset_page(stmt, ShoppingPlan, before, before_id, limit))
+    ).all()
+    plan_items = await fetch_plan_items(db, [row.id for row in rows])
+    return [
+        PlanRow.from_row(row, plan_items=plan_items.get(row.id, ())) for row in rows
+    ]
+
+
 def _assert_member(group: Group, me: User):
     ids = [str(m.user_id) for m in group.members]
     if str(me.id) not in ids and str(group.creator_id) != str(me.id):
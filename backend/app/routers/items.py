@@ -3,16 +3,43 @@ Item CRUD & 共享權限 路由
 """
 
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Header,
+    Query,
+    Response,
+    UploadFile,
+    File,
+    status,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_, and_
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.concurrency import check_if_match, commit_versioned, set_etag
 from app.core.deps import get_current_user
+from app.core.invalidation import InvalidationKind, publish
+from app.core.fields import parse_fields, sparse_response
 from app.models.user import User, Friendship
 from app.models.item import Item, ItemShare, SharePermission
 from app.models.group import GroupMember
-from app.schemas import ItemCreate, ItemUpdate, ItemOut, ItemShareCreate, ItemShareOut
+from app.models.visibility import UserVisibleItem
+from app.schemas import (
+    ItemCreate,
+    ItemUpdate,
+    ItemOut,
+    ItemShareCreate,
+    ItemShareOut,
+    ItemImportResult,
+)
+from app.services.item_archive import item_scope
+from app.services.item_import import ImportDecodeError, import_items
+from app.services.pricing import estimate_price, estimate_prices
+from app.services.visibility import sync_items
+from app.services.reads import ITEM_COLUMNS, ItemRow
 
 router = APIRouter(prefix="/items", tags=["Items"])
 
@@ -29,6 +56,22 @@ async def _assert_can_edit(item: Item, me: User, db: AsyncSession):
     """確認使用者是 owner、或有 edit 共享權限、或是群組成員"""
     if item.owner_id == me.id:
         return
+    if settings.VISIBILITY_FANOUT_ENABLED:
+        # 展開表：單次主鍵範圍查詢
+        editable = (
+            await db.execute(
+                select(UserVisibleItem.item_id)
+                .where(
+                    UserVisibleItem.user_id == me.id,
+                    UserVisibleItem.item_id == item.id,
+                    UserVisibleItem.permission == "edit",
+                )
+                .limit(1)
+            )
+        ).scalar_one_or_none()
+        if editable:
+            return
+        raise HTTPException(status_code=403, detail="無編輯權限")
     share = (
         await db.execute(
             select(ItemShare).where(
@@ -58,83 +101,178 @@ async def _assert_can_edit(item: Item, me: User, db: AsyncSession):
 @router.post("", response_model=ItemOut, status_code=201)
 async def create_item(
     body: ItemCreate,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     me: User = Depends(get_current_user),
 ):
     item = Item(**body.model_dump(), owner_id=me.id)
+    if item.est_price is None:
+        # 未填價格時以歷史價格統計自動帶入
+        item.est_price = await estimate_price(db, item.name, item.group_id, me.id)
     db.add(item)
+    await db.flush()  # 取得 item.id，展開條件才不會綁定 NULL
+    await sync_items(db, Item.id == item.id)
     await db.commit()
     await db.refresh(item)
+    set_etag(response, item.version)
     return item
 
 
+@router.post("/import", response_model=ItemImportResult, status_code=201)
+async def import_items_file(
+    file: UploadFile = File(..., description="CSV（含標題列）或 NDJSON"),
+    format: str | None = Query(default=None, pattern="^(csv|ndjson)$"),
+    db: AsyncSession = Depends(get_db),
+    me: User = Depends(get_current_user),
+):
+    """批次匯入物品：逐列驗證，合法列於同一交易中寫入，回傳各列錯誤"""
+    fmt = format
+    if fmt is None:
+        fmt = "csv" if (file.filename or "").lower().endswith(".csv") else "ndjson"
+    try:
+        result = await import_items(db, file.file, fmt, me.id)
+    except ImportDecodeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await db.commit()
+    return result
+
+
 @router.get("", response_model=list[ItemOut])
 async def list_items(
+    fields: str | None = Query(
+        default=None, description="只回傳指定欄位，例如 id,name,status,quantity"
+    ),
+    archived: bool = Query(default=False, description="true 時只列出已封存的物品"),
     db: AsyncSession = Depends(get_db),
     me: User = Depends(get_current_user),
 ):
-    """列出：我建立的 + 被分享給我的 + 我加入群組的物品"""
-    # 我的物品
-    my_items = (
-        (await db.execute(select(Item).where(Item.owner_id == me.id))).scalars().all()
-    )
+    """列出：我建立的 + 被分享給我的 + 我加入群組的物品（預設不含已封存）"""
+    scope = item_scope(archived)
+    selected = parse_fields(fields, ItemOut)
+    if selected is None:
+        columns = list(ITEM_COLUMNS)  # Core 欄位查詢，不建立 ORM 實體
+    else:
+        # 去重與 is_shared 判斷需要 id / owner_id，價格預估需要 name / group_id
+        computed = ("is_shared", "price_estimate")
+        required = ["id", "owner_id"]
+        if "price_estimate" in selected:
+            required += ["name", "group_id"]
+        names = dict.fromkeys(
+            [*required, *(f for f in selected if f not in computed)]
+        )
+        columns = [getattr(Item, name) for name in names]
 
-    # 被分享給我
-    shared_ids = (
-        (
+    async def _fetch(stmt):
+        return (await db.execute(stmt)).all()
+
+    if settings.VISIBILITY_FANOUT_ENABLED:
+        # 展開表：以 user_id 單次索引範圍掃描取得全部可見物品
+        rows = (
             await db.execute(
-                select(ItemShare.item_id).where(ItemShare.shared_with == me.id)
+                select(*columns, UserVisibleItem.reason)
+                .join(UserVisibleItem, UserVisibleItem.item_id == Item.id)
+                .where(UserVisibleItem.user_id == me.id, scope)
             )
+        ).all()
+        candidates = rows
+        shared_ids = [row.id for row in rows if row.reason == "share"]
+    else:
+        # 我的物品
+        my_items = await _fetch(
+            select(*columns).where(Item.owner_id == me.id, scope)
         )
-        .scalars()
-        .all()
-    )
 
-    # 群組物品
-    my_group_ids = (
-        (
-            await db.execute(
-                select(GroupMember.group_id).where(GroupMember.user_id == me.id)
+        # 被分享給我
+        shared_ids = (
+            (
+                await db.execute(
+                    select(ItemShare.item_id).where(ItemShare.shared_with == me.id)
+                )
             )
+            .scalars()
+            .all()
         )
-        .scalars()
-        .all()
-    )
 
-    extra_items: list[Item] = []
-    if shared_ids or my_group_ids:
-        extra_result = await db.execute(
-            select(Item).where(
-                or_(
-                    Item.id.in_(shared_ids),
-                    Item.group_id.in_(my_group_ids),
+        # 群組物品
+        my_group_ids = (
+            (
+                await db.execute(
+                    select(GroupMember.group_id).where(GroupMember.user_id == me.id)
                 )
             )
+            .scalars()
+            .all()
         )
-        extra_items = extra_result.scalars().all()
 
-    # 合併去重，並標記是否為被分享的物品
-    shared_ids_set = set(shared_ids)
-    seen, result = set(), []
-    for item in [*my_items, *extra_items]:
+        extra_items = []
+        if shared_ids or my_group_ids:
+            extra_items = await _fetch(
+                select(*columns).where(
+                    or_(
+                        Item.id.in_(shared_ids),
+                        Item.group_id.in_(my_group_ids),
+                    ),
+                    scope,
+                )
+            )
+        candidates = [*my_items, *extra_items]
+
+    # 合併去重
+    seen, unique_items = set(), []
+    for item in candidates:
         if item.id not in seen:
             seen.add(item.id)
-            # 標記是否為被分享的物品（非自己建立的）
-            item.is_shared = item.owner_id != me.id and item.id in shared_ids_set
-            result.append(item)
-    return result
+            unique_items.append(item)
+
+    estimates = {}
+    if selected is None or "price_estimate" in selected:
+        estimates = await estimate_prices(db, unique_items)
+
+    # 標記是否為被分享的物品（非自己建立的）
+    shared_ids_set = set(shared_ids)
+    result = []
+    for item in unique_items:
+        computed = {
+            "is_shared": item.owner_id != me.id and item.id in shared_ids_set,
+            "price_estimate": estimates.get(item.id),
+        }
+        if selected is None:
+            result.append(ItemRow.from_row(item, **computed))
+        else:
+            result.append(
+                {
+                    f: computed[f] if f in computed else getattr(item, f)
+                    for f in selected
+                }
+            )
+    return result if selected is None else sparse_response(result)
 
 
 @router.get("/{item_id}", response_model=ItemOut)
 async def get_item(
     item_id: UUID,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     me: User = Depends(get_current_user),
 ):
     item = await _get_item_or_404(item_id, db)
-    # 簡單讀取權限：owner 或有任何 share 或同群組
+    # 簡單讀取權限：owner 或有任何 share 或同群組（兩種儲存方式規則相同）
     is_shared_item = False
-    if item.owner_id != me.id:
+    if item.owner_id != me.id and settings.VISIBILITY_FANOUT_ENABLED:
+        reasons = set(
+            (
+                await db.execute(
+                    select(UserVisibleItem.reason).where(
+                        UserVisibleItem.user_id == me.id,
+                        UserVisibleItem.item_id == item.id,
+                    )
+                )
+            ).scalars()
+        )
+        if not reasons:
+            raise HTTPException(status_code=403, detail="無讀取權限")
+        is_shared_item = "share" in reasons
+    elif item.owner_id != me.id:
         share = (
             await db.execute(
                 select(ItemShare).where(
@@ -142,10 +280,19 @@ async def get_item(
                 )
             )
         ).scalar_one_or_none()
-        if not share:
+        is_shared_item = share is not None
+        if not share and not (
+            item.group_id is not None
+            and await db.scalar(
+                select(GroupMember.user_id).where(
+                    GroupMember.group_id == item.group_id,
+                    GroupMember.user_id == me.id,
+                )
+            )
+        ):
             raise HTTPException(status_code=403, detail="無讀取權限")
-        is_shared_item = True
     item.is_shared = is_shared_item
+    set_etag(response, item.version)
     return item
 
 
@@ -153,17 +300,23 @@ async def get_item(
 async def update_item(
     item_id: UUID,
     body: ItemUpdate,
+    response: Response,
+    if_match: str | None = Header(default=None),
     db: AsyncSession = Depends(get_db),
     me: User = Depends(get_current_user),
 ):
     item = await _get_item_or_404(item_id, db)
     await _assert_can_edit(item, me, db)
+    check_if_match(if_match, item.version)
 
     for field, val in body.model_dump(exclude_none=True).items():
         setattr(item, field, val)
 
-    await db.commit()
+    # UPDATE ... WHERE version = ?，並行修改時回 412
+    await publish(db, InvalidationKind.item, item_id)
+    await commit_versioned(db)
     await db.refresh(item)
+    set_etag(response, item.version)
     return item
 
 
@@ -177,6 +330,7 @@ async def delete_item(
     if item.owner_id != me.id:
         raise HTTPException(status_code=403, detail="只有建立者可刪除")
     await db.delete(item)
+    await publish(db, InvalidationKind.item, item_id)
     await db.commit()
 
 
@@ -231,6 +385,8 @@ async def share_item(
 
     share = ItemShare(item_id=item_id, **body.model_dump())
     db.add(share)
+    await sync_items(db, Item.id == item_id)
+    await publish(db, InvalidationKind.share, item_id)
     await db.commit()
     await db.refresh(share)
     return share
@@ -266,4 +422,6 @@ async def revoke_share(
     if not share:
         raise HTTPException(status_code=404, detail="分享記錄不存在")
     await db.delete(share)
+    await sync_items(db, Item.id == item_id)
+    await publish(db, InvalidationKind.share, item_id)
     await db.commit()
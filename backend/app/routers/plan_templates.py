@@ -0,0 +1,144 @@
+"""
+PlanTemplate 路由：將計畫存為範本、依範本產生計畫、設定週期
+"""
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.core.database import get_db
+from app.core.deps import get_current_user
+from app.models.user import User
+from app.models.plan import ShoppingPlan, PlanTemplate
+from app.schemas import (
+    PlanOut,
+    PlanTemplateCreate,
+    PlanTemplateUpdate,
+    PlanTemplateInstantiate,
+    PlanTemplateOut,
+)
+from app.services.plan_templates import (
+    count_items,
+    first_run_on,
+    instantiate,
+    save_template,
+)
+
+router = APIRouter(prefix="/plan-templates", tags=["Plan Templates"])
+
+
+async def _get_own_template_or_404(
+    template_id: UUID, me: User, db: AsyncSession
+) -> PlanTemplate:
+    template = await db.get(PlanTemplate, template_id)
+    if not template:
+        raise HTTPException(status_code=404, detail="計畫範本不存在")
+    if template.creator_id != me.id:
+        raise HTTPException(status_code=403, detail="無權限")
+    return template
+
+
+async def _template_out(db: AsyncSession, template: PlanTemplate) -> PlanTemplate:
+    counts = await count_items(db, [template.id])
+    template.item_count = counts.get(template.id, 0)
+    return template
+
+
+@router.post("", response_model=PlanTemplateOut, status_code=201)
+async def create_template(
+    body: PlanTemplateCreate,
+    db: AsyncSession = Depends(get_db),
+    me: User = Depends(get_current_user),
+):
+    plan = await db.get(ShoppingPlan, body.plan_id)
+    if not plan:
+        raise HTTPException(status_code=404, detail="購物計畫不存在")
+    if plan.creator_id != me.id:
+        raise HTTPException(status_code=403, detail="只有建立者可存為範本")
+    template = await save_template(
+        db,
+        plan,
+        name=body.name,
+        recurrence_days=body.recurrence_days,
+        next_run_on=body.next_run_on,
+    )
+    await db.commit()
+    return await _template_out(db, template)
+
+
+@router.get("", response_model=list[PlanTemplateOut])
+async def list_templates(
+    db: AsyncSession = Depends(get_db),
+    me: User = Depends(get_current_user),
+):
+    templates = (
+        (
+            await db.execute(
+                select(PlanTemplate)
+                .where(PlanTemplate.creator_id == me.id)
+                .order_by(PlanTemplate.created_at.desc())
+            )
+        )
+        .scalars()
+        .all()
+    )
+    counts = await count_items(db, [t.id for t in templates])
+    for template in templates:
+        template.item_count = counts.get(template.id, 0)
+    return templates
+
+
+@router.patch("/{template_id}", response_model=PlanTemplateOut)
+async def update_template(
+    template_id: UUID,
+    body: PlanTemplateUpdate,
+    db: AsyncSession = Depends(get_db),
+    me: User = Depends(get_current_user),
+):
+    """recurrence_days 設為 null 可停止週期產生"""
+    template = await _get_own_template_or_404(template_id, me, db)
+    changes = body.model_dump(exclude_unset=True)
+    if changes.get("name") is not None:
+        template.name = changes["name"]
+    if "recurrence_days" in changes or "next_run_on" in changes:
+        template.recurrence_days = changes.get(
+            "recurrence_days", template.recurrence_days
+        )
+        template.next_run_on = first_run_on(
+            template.recurrence_days, changes.get("next_run_on")
+        )
+    await db.commit()
+    return await _template_out(db, template)
+
+
+@router.delete("/{template_id}", status_code=204)
+async def delete_template(
+    template_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    me: User = Depends(get_current_user),
+):
+    template = await _get_own_template_or_404(template_id, me, db)
+    await db.delete(template)
+    await db.commit()
+
+
+@router.post("/{template_id}/instantiate", response_model=PlanOut, status_code=201)
+async def instantiate_template(
+    template_id: UUID,
+    body: PlanTemplateInstantiate,
+    db: AsyncSession = Depends(get_db),
+    me: User = Depends(get_current_user),
+):
+    """依範本產生計畫：計畫物品與物品狀態皆於伺服器端批次處理"""
+    template = await _get_own_template_or_404(template_id, me, db)
+    plan_id = await instantiate(db, template, name=body.name, exec_date=body.exec_date)
+    await db.commit()
+
+    result = await db.execute(
+        select(ShoppingPlan)
+        .options(selectinload(ShoppingPlan.plan_items))
+        .where(ShoppingPlan.id == plan_id)
+    )
+    return result.scalar_one()
@@ -5,20 +5,27 @@ ShoppingPlan 路由：建立計畫、勾除物品、完成計畫並轉存購買
 from uuid import UUID
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, and_
+from sqlalchemy import select, func, or_, and_
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import flag_modified
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.concurrency import check_if_match, commit_versioned, set_etag
 from app.core.deps import get_current_user
+from app.core.invalidation import InvalidationKind, publish
+from app.core.fields import parse_fields, sparse_response
 from app.models.user import User, Friendship
-from app.models.item import Item, ItemStatus
+from app.models.item import Item, ItemCategory, ItemStatus
+from app.models.suggestion import RepurchaseStat
 from app.models.plan import (
     ShoppingPlan,
     PlanItem,
     PlanStatus,
     PurchaseRecord,
+    PurchaseRecordArchive,
     PlanShare,
     PlanSharePermission,
 )
@@ -26,10 +33,21 @@ from app.schemas import (
     PlanCreate,
     PlanUpdate,
     PlanOut,
+    PlanDetailOut,
     PlanItemToggle,
     PurchaseRecordOut,
     PlanShareCreate,
     PlanShareOut,
+    SuggestionAccept,
+)
+from app.models.visibility import UserVisiblePlan
+from app.services.pricing import record_prices
+from app.services.visibility import sync_items, sync_plans
+from app.services.reads import PLAN_COLUMNS, PlanRow, fetch_plan_items
+from app.services.suggestions import (
+    normalize_item_name,
+    record_purchases,
+    visible_stats_filter,
 )
 
 router = APIRouter(prefix="/plans", tags=["Shopping Plans"])
@@ -68,6 +86,19 @@ async def _can_edit_plan(plan: ShoppingPlan, me: User, db: AsyncSession) -> bool
     """確認使用者是 creator 或有 edit 共享權限"""
     if plan.creator_id == me.id:
         return True
+    if settings.VISIBILITY_FANOUT_ENABLED:
+        editable = (
+            await db.execute(
+                select(UserVisiblePlan.plan_id)
+                .where(
+                    UserVisiblePlan.user_id == me.id,
+                    UserVisiblePlan.plan_id == plan.id,
+                    UserVisiblePlan.permission == "edit",
+                )
+                .limit(1)
+            )
+        ).scalar_one_or_none()
+        return editable is not None
     share = (
         await db.execute(
             select(PlanShare).where(
@@ -83,6 +114,7 @@ async def _can_edit_plan(plan: ShoppingPlan, me: User, db: AsyncSession) -> bool
 @router.post("", response_model=PlanOut, status_code=201)
 async def create_plan(
     body: PlanCreate,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     me: User = Depends(get_current_user),
 ):
@@ -105,6 +137,7 @@ async def create_plan(
             db.add(PlanItem(plan_id=plan.id, item_id=item_id))
             item.status = ItemStatus.shopping  # 標記為購物中
 
+    await sync_plans(db, ShoppingPlan.id == plan.id)
     await db.commit()
 
     # 重新查詢並載入 plan_items 關聯
@@ -113,65 +146,127 @@ async def create_plan(
         .options(selectinload(ShoppingPlan.plan_items))
         .where(ShoppingPlan.id == plan.id)
     )
-    return result.scalar_one()
+    plan = result.scalar_one()
+    set_etag(response, plan.version)
+    return plan
 
 
 @router.get("", response_model=list[PlanOut])
 async def list_plans(
+    fields: str | None = Query(
+        default=None, description="只回傳指定欄位，例如 id,name,status"
+    ),
     db: AsyncSession = Depends(get_db),
     me: User = Depends(get_current_user),
 ):
     """列出：我建立的 + 被分享給我的計畫"""
-    # 我建立的計畫
-    my_plans = (
-        (
+    selected = parse_fields(fields, PlanOut)
+    if selected is None:
+        columns = list(PLAN_COLUMNS)  # Core 欄位查詢，不建立 ORM 實體
+    else:
+        names = dict.fromkeys(
+            [
+                "id",
+                "creator_id",
+                *(f for f in selected if f not in ("is_shared", "plan_items")),
+            ]
+        )
+        columns = [getattr(ShoppingPlan, name) for name in names]
+
+    async def _fetch(stmt):
+        return (await db.execute(stmt)).all()
+
+    if settings.VISIBILITY_FANOUT_ENABLED:
+        # 展開表：以 user_id 單次索引範圍掃描取得全部可見計畫
+        rows = (
             await db.execute(
-                select(ShoppingPlan)
-                .options(selectinload(ShoppingPlan.plan_items))
-                .where(ShoppingPlan.creator_id == me.id)
+                select(*columns, UserVisiblePlan.reason)
+                .join(UserVisiblePlan, UserVisiblePlan.plan_id == ShoppingPlan.id)
+                .where(UserVisiblePlan.user_id == me.id)
                 .order_by(ShoppingPlan.created_at.desc())
             )
+        ).all()
+        candidates = rows
+        shared_plan_ids = [row.id for row in rows if row.reason == "share"]
+    else:
+        # 我建立的計畫
+        my_plans = await _fetch(
+            select(*columns)
+            .where(ShoppingPlan.creator_id == me.id)
+            .order_by(ShoppingPlan.created_at.desc())
         )
-        .scalars()
-        .all()
-    )
 
-    # 被分享給我的計畫 IDs
-    shared_plan_ids = (
-        (
-            await db.execute(
-                select(PlanShare.plan_id).where(PlanShare.shared_with == me.id)
+        # 被分享給我的計畫 IDs
+        shared_plan_ids = (
+            (
+                await db.execute(
+                    select(PlanShare.plan_id).where(PlanShare.shared_with == me.id)
+                )
             )
+            .scalars()
+            .all()
         )
-        .scalars()
-        .all()
-    )
 
-    # 載入被分享的計畫
-    shared_plans: list[ShoppingPlan] = []
-    if shared_plan_ids:
-        shared_result = await db.execute(
-            select(ShoppingPlan)
-            .options(selectinload(ShoppingPlan.plan_items))
-            .where(ShoppingPlan.id.in_(shared_plan_ids))
-            .order_by(ShoppingPlan.created_at.desc())
-        )
-        shared_plans = shared_result.scalars().all()
+        # 載入被分享的計畫
+        shared_plans = []
+        if shared_plan_ids:
+            shared_plans = await _fetch(
+                select(*columns)
+                .where(ShoppingPlan.id.in_(shared_plan_ids))
+                .order_by(ShoppingPlan.created_at.desc())
+            )
+        candidates = [*my_plans, *shared_plans]
 
     # 合併去重並標記是否為被分享
     shared_ids_set = set(shared_plan_ids)
     seen, result = set(), []
-    for plan in [*my_plans, *shared_plans]:
+    if selected is None:
+        plan_items = await fetch_plan_items(db, {plan.id for plan in candidates})
+    for plan in candidates:
         if plan.id not in seen:
             seen.add(plan.id)
-            plan.is_shared = plan.creator_id != me.id and plan.id in shared_ids_set
-            result.append(plan)
-    return result
+            is_shared = plan.creator_id != me.id and plan.id in shared_ids_set
+            if selected is None:
+                result.append(
+                    PlanRow.from_row(
+                        plan,
+                        plan_items=plan_items.get(plan.id, ()),
+                        is_shared=is_shared,
+                    )
+                )
+            else:
+                row = {
+                    f: getattr(plan, f)
+                    for f in selected
+                    if f not in ("is_shared", "plan_items")
+                }
+                if "is_shared" in selected:
+                    row["is_shared"] = is_shared
+                result.append(row)
+    if selected is None:
+        return result
+
+    # 需要 plan_items 時以單次查詢補上精簡欄位
+    if "plan_items" in selected and result:
+        items_by_plan: dict[UUID, list[dict]] = {row["id"]: [] for row in result}
+        pi_rows = await db.execute(
+            select(
+                PlanItem.id, PlanItem.plan_id, PlanItem.item_id, PlanItem.is_done
+            ).where(PlanItem.plan_id.in_(items_by_plan))
+        )
+        for pi in pi_rows:
+            items_by_plan[pi.plan_id].append(
+                {"id": pi.id, "item_id": pi.item_id, "is_done": pi.is_done}
+            )
+        for row in result:
+            row["plan_items"] = items_by_plan[row["id"]]
+    return sparse_response(result)
 
 
 @router.get("/{plan_id}", response_model=PlanOut)
 async def get_plan(
     plan_id: UUID,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     me: User = Depends(get_current_user),
 ):
@@ -180,23 +275,81 @@ async def get_plan(
     if plan.creator_id != me.id and share is None:
         raise HTTPException(status_code=403, detail="無權限查看")
     plan.is_shared = share is not None
+    set_etag(response, plan.version)
     return plan
 
 
+@router.get("/{plan_id}/detail", response_model=PlanDetailOut)
+async def get_plan_detail(
+    plan_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    me: User = Depends(get_current_user),
+):
+    """計畫明細：單次 JOIN 取回所有計畫物品與物品欄位，並由 SQL 計算預估總額"""
+    plan = (
+        await db.execute(select(ShoppingPlan).where(ShoppingPlan.id == plan_id))
+    ).scalar_one_or_none()
+    if not plan:
+        raise HTTPException(status_code=404, detail="購物計畫不存在")
+    share = await _can_view_plan(plan, me, db)
+    if plan.creator_id != me.id and share is None:
+        raise HTTPException(status_code=403, detail="無權限查看")
+
+    line_total = func.coalesce(Item.est_price, 0) * Item.quantity
+    rows = (
+        await db.execute(
+            select(
+                PlanItem.id,
+                PlanItem.item_id,
+                PlanItem.is_done,
+                Item.name,
+                Item.quantity,
+                Item.est_price,
+                Item.category,
+                Item.brand_note,
+                func.sum(line_total).over().label("est_total"),
+            )
+            .join(Item, Item.id == PlanItem.item_id)
+            .where(PlanItem.plan_id == plan_id)
+            .order_by(Item.name)
+        )
+    ).all()
+
+    return {
+        "id": plan.id,
+        "name": plan.name,
+        "creator_id": plan.creator_id,
+        "group_id": plan.group_id,
+        "exec_date": plan.exec_date,
+        "status": plan.status,
+        "created_at": plan.created_at,
+        "completed_at": plan.completed_at,
+        "version": plan.version,
+        "is_shared": share is not None,
+        "plan_items": [dict(row._mapping) for row in rows],
+        "est_total": rows[0].est_total if rows else 0,
+    }
+
+
 @router.patch("/{plan_id}", response_model=PlanOut)
 async def update_plan(
     plan_id: UUID,
     body: PlanUpdate,
+    response: Response,
+    if_match: str | None = Header(default=None),
     db: AsyncSession = Depends(get_db),
     me: User = Depends(get_current_user),
 ):
     plan = await _get_plan_or_404(plan_id, db)
     if not await _can_edit_plan(plan, me, db):
         raise HTTPException(status_code=403, detail="無權限修改")
+    check_if_match(if_match, plan.version)
     for field, val in body.model_dump(exclude_none=True).items():
         setattr(plan, field, val)
-    await db.commit()
+    await publish(db, InvalidationKind.plan, plan_id)
+    await commit_versioned(db)
     await db.refresh(plan)
+    set_etag(response, plan.version)
     return plan
 
 
@@ -206,6 +359,8 @@ async def toggle_plan_item(
     plan_id: UUID,
     plan_item_id: UUID,
     body: PlanItemToggle,
+    response: Response,
+    if_match: str | None = Header(default=None),
     db: AsyncSession = Depends(get_db),
     me: User = Depends(get_current_user),
 ):
@@ -219,17 +374,114 @@ async def toggle_plan_item(
     plan_item = result.scalar_one_or_none()
     if not plan_item:
         raise HTTPException(status_code=404, detail="計畫物品不存在")
+    # 回應本體為計畫：If-Match 與 ETag 皆使用計畫版本，勾選也會遞增計畫版本
+    check_if_match(if_match, plan.version)
 
     plan_item.is_done = body.is_done
-    await db.commit()
+    flag_modified(plan, "status")  # 無實際變更也送出 UPDATE，遞增 version
+    await publish(db, InvalidationKind.plan, plan_id)
+    await commit_versioned(db)
     await db.refresh(plan)
+    set_etag(response, plan.version)
     return plan
 
 
+# ── 將回購建議加入計畫 ───────────────────────────────────────────────────
+@router.post("/{plan_id}/suggestions", response_model=PlanOut)
+async def add_suggestions_to_plan(
+    plan_id: UUID,
+    body: SuggestionAccept,
+    db: AsyncSession = Depends(get_db),
+    me: User = Depends(get_current_user),
+):
+    """沿用同名的既有物品（否則依建議建立新物品），一次加入計畫"""
+    plan = await _get_plan_or_404(plan_id, db)
+    if not await _can_edit_plan(plan, me, db):
+        raise HTTPException(status_code=403, detail="無權限")
+    if plan.status == PlanStatus.completed:
+        raise HTTPException(status_code=400, detail="計畫已完成")
+
+    name_keys = list(dict.fromkeys(normalize_item_name(k) for k in body.name_keys))
+    stats: dict[str, RepurchaseStat] = {}
+    for stat in (
+        await db.execute(
+            select(RepurchaseStat)
+            .where(
+                visible_stats_filter(me.id), RepurchaseStat.name_key.in_(name_keys)
+            )
+            .order_by(RepurchaseStat.next_due_at)
+        )
+    ).scalars():
+        stats.setdefault(stat.name_key, stat)
+
+    # 名稱比對須與 normalize_item_name 一致（NFKC、空白合併），SQL 無法表達，
+    # 先只取 id 與名稱於 Python 端比對，再載入命中的物品
+    wanted = set(name_keys)
+    matched: dict[str, UUID] = {}
+    for item_id, name in await db.execute(
+        select(Item.id, Item.name)
+        .where(Item.owner_id == me.id)
+        .order_by(Item.created_at)
+    ):
+        name_key = normalize_item_name(name)
+        if name_key in wanted:
+            matched.setdefault(name_key, item_id)
+    my_items: dict[str, Item] = {}
+    if matched:
+        loaded = {
+            item.id: item
+            for item in (
+                await db.execute(select(Item).where(Item.id.in_(matched.values())))
+            ).scalars()
+        }
+        my_items = {key: loaded[item_id] for key, item_id in matched.items()}
+
+    in_plan = {pi.item_id for pi in plan.plan_items}
+    created: list[Item] = []
+    for name_key in name_keys:
+        stat = stats.get(name_key)
+        if stat is None:
+            continue
+        item = my_items.get(name_key)
+        if item is None:
+            item = Item(
+                owner_id=me.id,
+                group_id=stat.scope_id if stat.scope_type == "group" else None,
+                name=stat.display_name,
+                quantity=stat.last_quantity,
+                category=(
+                    ItemCategory(stat.category)
+                    if stat.category in ItemCategory.__members__
+                    else ItemCategory.essential
+                ),
+            )
+            db.add(item)
+            created.append(item)
+        elif item.id in in_plan:
+            continue
+        item.status = ItemStatus.shopping  # 標記為購物中
+        db.add(PlanItem(plan_id=plan.id, item=item))
+
+    if created:
+        await db.flush()  # 取得新物品 id
+        await sync_items(db, Item.id.in_([item.id for item in created]))
+    await publish(db, InvalidationKind.plan, plan_id)
+    await commit_versioned(db)
+
+    result = await db.execute(
+        select(ShoppingPlan)
+        .options(selectinload(ShoppingPlan.plan_items))
+        .where(ShoppingPlan.id == plan.id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
 # ── 完成計畫：全部打勾並轉存購買紀錄 ────────────────────────────────────
 @router.post("/{plan_id}/complete", response_model=PlanOut)
 async def complete_plan(
     plan_id: UUID,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     me: User = Depends(get_current_user),
 ):
@@ -239,28 +491,37 @@ async def complete_plan(
     if plan.status == PlanStatus.completed:
         raise HTTPException(status_code=400, detail="計畫已完成")
 
+    now = datetime.utcnow()
+    records = []
     for pi in plan.plan_items:
         result = await db.execute(select(Item).where(Item.id == pi.item_id))
         item = result.scalar_one_or_none()
         if item:
             # 轉存購買紀錄
-            db.add(
-                PurchaseRecord(
-                    plan_id=plan.id,
-                    item_name=item.name,
-                    quantity=item.quantity,
-                    actual_price=item.est_price,
-                    category=item.category.value,
-                    note=item.note,
-                )
+            record = PurchaseRecord(
+                plan_id=plan.id,
+                item_name=item.name,
+                quantity=item.quantity,
+                actual_price=item.est_price,
+                category=item.category.value,
+                note=item.note,
+                purchased_at=now,
             )
+            db.add(record)
+            records.append(record)
             # 更新物品狀態
             item.status = ItemStatus.purchased
 
+    # 回購建議與價格統計與紀錄同一交易提交
+    await record_purchases(db, plan, records)
+    await record_prices(db, plan, records)
+
     plan.status = PlanStatus.completed
-    plan.completed_at = datetime.utcnow()
-    await db.commit()
+    plan.completed_at = now
+    await publish(db, InvalidationKind.plan, plan_id)
+    await commit_versioned(db)
     await db.refresh(plan)
+    set_etag(response, plan.version)
     return plan
 
 
@@ -275,12 +536,26 @@ async def list_records(
     share = await _can_view_plan(plan, me, db)
     if plan.creator_id != me.id and share is None:
         raise HTTPException(status_code=403, detail="無權限")
+    # 紀錄必定晚於計畫建立時間：加上下界讓 PostgreSQL 只掃描相關月分區
     result = await db.execute(
         select(PurchaseRecord)
-        .where(PurchaseRecord.plan_id == plan_id)
+        .where(
+            PurchaseRecord.plan_id == plan_id,
+            PurchaseRecord.purchased_at >= plan.created_at,
+        )
         .order_by(PurchaseRecord.purchased_at.desc())
     )
-    return result.scalars().all()
+    records: list = list(result.scalars().all())
+
+    # 已封存的舊分區紀錄（較舊，接在後面並維持新到舊排序）
+    archived = await db.execute(
+        select(PurchaseRecordArchive.records)
+        .where(PurchaseRecordArchive.plan_id == plan_id)
+        .order_by(PurchaseRecordArchive.month.desc())
+    )
+    for rows in archived.scalars():
+        records.extend(reversed(rows))
+    return records
 
 
 @router.delete("/{plan_id}", status_code=204)
@@ -293,6 +568,7 @@ async def delete_plan(
     if plan.creator_id != me.id:
         raise HTTPException(status_code=403, detail="無權限刪除")
     await db.delete(plan)
+    await publish(db, InvalidationKind.plan, plan_id)
     await db.commit()
 
 
@@ -359,6 +635,8 @@ async def share_plan(
 
     share = PlanShare(plan_id=plan_id, **body.model_dump())
     db.add(share)
+    await sync_plans(db, ShoppingPlan.id == plan_id)
+    await publish(db, InvalidationKind.share, plan_id)
     await db.commit()
     await db.refresh(share)
     return share
@@ -394,4 +672,6 @@ async def revoke_plan_share(
     if not share:
         raise HTTPException(status_code=404, detail="分享記錄不存在")
     await db.delete(share)
+    await sync_plans(db, ShoppingPlan.id == plan_id)
+    await publish(db, InvalidationKind.share, plan_id)
     await db.commit()
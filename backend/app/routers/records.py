@@ -0,0 +1,207 @@
+"""
+購買紀錄匯出路由：跨計畫串流輸出 CSV / NDJSON
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from enum import Enum
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, or_
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.deps import get_current_user
+from app.models.user import User
+from app.models.plan import (
+    ShoppingPlan,
+    PurchaseRecord,
+    PurchaseRecordArchive,
+    PlanShare,
+)
+
+router = APIRouter(prefix="/records", tags=["Purchase Records"])
+
+EXPORT_COLUMNS = (
+    "id",
+    "plan_id",
+    "item_name",
+    "quantity",
+    "actual_price",
+    "category",
+    "note",
+    "purchased_at",
+)
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+def _visible_plans(me: User):
+    """我建立的 + 被分享給我的計畫 IDs（子查詢）"""
+    return select(ShoppingPlan.id).where(
+        or_(
+            ShoppingPlan.creator_id == me.id,
+            ShoppingPlan.id.in_(
+                select(PlanShare.plan_id).where(PlanShare.shared_with == me.id)
+            ),
+        )
+    )
+
+
+def _visible_records_stmt(
+    me: User, date_from: datetime | None, date_to: datetime | None
+):
+    """可見計畫之購買紀錄（Core 欄位查詢，不建立 ORM 物件）"""
+    stmt = select(*(getattr(PurchaseRecord, c) for c in EXPORT_COLUMNS)).where(
+        PurchaseRecord.plan_id.in_(_visible_plans(me))
+    )
+    if date_from:
+        stmt = stmt.where(PurchaseRecord.purchased_at >= date_from)
+    if date_to:
+        stmt = stmt.where(PurchaseRecord.purchased_at < date_to)
+    return stmt.order_by(PurchaseRecord.purchased_at.desc(), PurchaseRecord.id)
+
+
+def _visible_archives_stmt(
+    me: User, date_from: datetime | None, date_to: datetime | None
+):
+    """封存層：以月份粗篩，逐筆時間於串流時再過濾"""
+    stmt = select(PurchaseRecordArchive.month, PurchaseRecordArchive.records).where(
+        PurchaseRecordArchive.plan_id.in_(_visible_plans(me))
+    )
+    if date_from:
+        stmt = stmt.where(
+            PurchaseRecordArchive.month >= date_from.date().replace(day=1)
+        )
+    if date_to:
+        stmt = stmt.where(PurchaseRecordArchive.month < date_to.date())
+    return stmt.order_by(PurchaseRecordArchive.month.desc())
+
+
+def _naive_utc(value: datetime | None) -> datetime | None:
+    """purchased_at 以 naive UTC 儲存；帶時區的查詢參數先轉換，避免串流中途比較失敗"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+_CENT = Decimal("0.01")
+
+
+def _archived_row(record: dict) -> tuple:
+    """JSON 封存紀錄轉為與即時紀錄相同型別的列（價格為 Numeric(10, 2) 的 Decimal）"""
+    record = dict(
+        record, purchased_at=datetime.fromisoformat(record["purchased_at"])
+    )
+    if record.get("actual_price") is not None:
+        record["actual_price"] = Decimal(str(record["actual_price"])).quantize(_CENT)
+    return tuple(record.get(c) for c in EXPORT_COLUMNS)
+
+
+def _sorted_like_live(rows: list[tuple]) -> list[tuple]:
+    """與即時紀錄同序：purchased_at 由新到舊、id 由小到大"""
+    purchased_at = EXPORT_COLUMNS.index("purchased_at")
+    rows.sort(key=lambda row: str(row[0]))
+    rows.sort(key=lambda row: row[purchased_at], reverse=True)
+    return rows
+
+
+def _format_value(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (int, str)):
+        return value
+    return str(value)  # UUID / Decimal
+
+
+def _encode(rows, fmt: ExportFormat) -> str:
+    buf = io.StringIO()
+    if fmt == ExportFormat.csv:
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow(_format_value(v) for v in row)
+    else:
+        for row in rows:
+            buf.write(
+                json.dumps(
+                    {c: _format_value(v) for c, v in zip(EXPORT_COLUMNS, row)},
+                    ensure_ascii=False,
+                )
+            )
+            buf.write("\n")
+    return buf.getvalue()
+
+
+async def _stream_rows(
+    fmt: ExportFormat,
+    me: User,
+    date_from: datetime | None,
+    date_to: datetime | None,
+):
+    """
+    以 server-side cursor 分批讀取並逐批輸出，記憶體用量與總筆數無關。
+    串流期間自行開啟 session：get_db 的 session 會在回應送出前關閉。
+    """
+    async with AsyncSessionLocal() as session:
+        if fmt == ExportFormat.csv:
+            buf = io.StringIO()
+            csv.writer(buf).writerow(EXPORT_COLUMNS)
+            yield buf.getvalue()
+
+        result = await session.stream(
+            _visible_records_stmt(me, date_from, date_to).execution_options(
+                yield_per=settings.EXPORT_BATCH_SIZE
+            )
+        )
+        async for partition in result.partitions():
+            yield _encode(partition, fmt)
+
+        archived = await session.stream(
+            _visible_archives_stmt(me, date_from, date_to).execution_options(
+                yield_per=settings.EXPORT_BATCH_SIZE
+            )
+        )
+        # 封存月份皆早於即時分區：同月各計畫的紀錄合併排序後接在即時紀錄之後，
+        # 一次只保留一個月份
+        purchased_at = EXPORT_COLUMNS.index("purchased_at")
+        month, rows = None, []
+        async for archive in archived:
+            if archive.month != month:
+                if rows:
+                    yield _encode(_sorted_like_live(rows), fmt)
+                month, rows = archive.month, []
+            for row in map(_archived_row, archive.records):
+                if date_from and row[purchased_at] < date_from:
+                    continue
+                if date_to and row[purchased_at] >= date_to:
+                    continue
+                rows.append(row)
+        if rows:
+            yield _encode(_sorted_like_live(rows), fmt)
+
+
+@router.get("/export")
+async def export_records(
+    format: ExportFormat = ExportFormat.csv,
+    date_from: datetime | None = Query(default=None, description="起始時間（含）"),
+    date_to: datetime | None = Query(default=None, description="結束時間（不含）"),
+    me: User = Depends(get_current_user),
+):
+    if format == ExportFormat.csv:
+        media_type, filename = "text/csv; charset=utf-8", "purchase_records.csv"
+    else:
+        media_type, filename = "application/x-ndjson", "purchase_records.ndjson"
+    return StreamingResponse(
+        _stream_rows(format, me, _naive_utc(date_from), _naive_utc(date_to)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
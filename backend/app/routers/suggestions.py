@@ -0,0 +1,42 @@
+"""
+回購建議路由：讀取預先計算的「即將需要補貨」物品
+"""
+
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.core.database import get_db
+from app.core.deps import get_current_user
+from app.models.user import User
+from app.models.suggestion import RepurchaseStat
+from app.schemas import SuggestionOut
+from app.services.suggestions import visible_stats_filter
+
+router = APIRouter(prefix="/suggestions", tags=["Suggestions"])
+
+
+@router.get("", response_model=list[SuggestionOut])
+async def list_suggestions(
+    within_days: int = Query(default=3, ge=0, le=90, description="幾天內到期"),
+    limit: int = Query(default=50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    me: User = Depends(get_current_user),
+):
+    """依 (scope, next_due_at) 索引範圍讀取，不掃描購買紀錄"""
+    horizon = datetime.utcnow() + timedelta(days=within_days)
+    result = await db.execute(
+        select(RepurchaseStat)
+        .where(visible_stats_filter(me.id), RepurchaseStat.next_due_at <= horizon)
+        .order_by(RepurchaseStat.next_due_at)
+        .limit(limit)
+    )
+    # 同名物品同時存在個人與群組統計時，只保留最早到期的一筆
+    seen, suggestions = set(), []
+    for stat in result.scalars():
+        if stat.name_key not in seen:
+            seen.add(stat.name_key)
+            suggestions.append(stat)
+    return suggestions
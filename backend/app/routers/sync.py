@@ -0,0 +1,222 @@
+"""
+離線同步路由：一次套用用戶端累積的操作紀錄
+
+衝突規則（決定性）：
+  - 依請求中的順序逐一套用，全部於同一交易內完成
+  - base_version 與「本批次開始前」的伺服器版本比對，不符即為 conflict，
+    伺服器資料優先，該操作略過；同一實體後續操作一併視為 conflict
+  - 同一批次內 op_id 重複者略過（duplicate）
+  - 並行寫入導致 commit 時版本不符：整批回滾並回 412，用戶端重送即可
+"""
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.core.database import get_db
+from app.core.concurrency import commit_versioned
+from app.core.deps import get_current_user
+from app.core.invalidation import InvalidationKind, publish
+from app.models.user import User
+from app.models.item import Item, ItemShare, SharePermission
+from app.models.group import GroupMember
+from app.models.plan import ShoppingPlan, PlanItem, PlanShare, PlanSharePermission
+from app.schemas import (
+    SyncBatch,
+    SyncBatchOut,
+    SyncResult,
+    ItemUpdateOp,
+    PlanUpdateOp,
+    PlanItemToggleOp,
+)
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+class _Permissions:
+    """一次查出批次內所有實體與權限，避免逐筆查詢"""
+
+    def __init__(self):
+        self.items: dict[UUID, Item] = {}
+        self.plans: dict[UUID, ShoppingPlan] = {}
+        self.plan_items: dict[UUID, PlanItem] = {}
+        self.item_shares: set[UUID] = set()
+        self.plan_shares: set[UUID] = set()
+        self.groups: set[UUID] = set()
+
+    @classmethod
+    async def load(cls, body: SyncBatch, me: User, db: AsyncSession):
+        perms = cls()
+        item_ids = {
+            op.item_id for op in body.operations if isinstance(op, ItemUpdateOp)
+        }
+        plan_ids = {
+            op.plan_id
+            for op in body.operations
+            if isinstance(op, (PlanUpdateOp, PlanItemToggleOp))
+        }
+        plan_item_ids = {
+            op.plan_item_id
+            for op in body.operations
+            if isinstance(op, PlanItemToggleOp)
+        }
+
+        if item_ids:
+            items = (
+                await db.execute(select(Item).where(Item.id.in_(item_ids)))
+            ).scalars()
+            perms.items = {item.id: item for item in items}
+            perms.item_shares = set(
+                (
+                    await db.execute(
+                        select(ItemShare.item_id).where(
+                            ItemShare.item_id.in_(item_ids),
+                            ItemShare.shared_with == me.id,
+                            ItemShare.permission == SharePermission.edit,
+                        )
+                    )
+                ).scalars()
+            )
+            group_ids = {i.group_id for i in perms.items.values() if i.group_id}
+            if group_ids:
+                perms.groups = set(
+                    (
+                        await db.execute(
+                            select(GroupMember.group_id).where(
+                                GroupMember.group_id.in_(group_ids),
+                                GroupMember.user_id == me.id,
+                            )
+                        )
+                    ).scalars()
+                )
+
+        if plan_ids:
+            plans = (
+                await db.execute(
+                    select(ShoppingPlan).where(ShoppingPlan.id.in_(plan_ids))
+                )
+            ).scalars()
+            perms.plans = {plan.id: plan for plan in plans}
+            perms.plan_shares = set(
+                (
+                    await db.execute(
+                        select(PlanShare.plan_id).where(
+                            PlanShare.plan_id.in_(plan_ids),
+                            PlanShare.shared_with == me.id,
+                            PlanShare.permission == PlanSharePermission.edit,
+                        )
+                    )
+                ).scalars()
+            )
+
+        if plan_item_ids:
+            plan_items = (
+                await db.execute(select(PlanItem).where(PlanItem.id.in_(plan_item_ids)))
+            ).scalars()
+            perms.plan_items = {pi.id: pi for pi in plan_items}
+        return perms
+
+    def can_edit_item(self, item: Item, me: User) -> bool:
+        return (
+            item.owner_id == me.id
+            or item.id in self.item_shares
+            or (item.group_id is not None and item.group_id in self.groups)
+        )
+
+    def can_edit_plan(self, plan: ShoppingPlan, me: User) -> bool:
+        return plan.creator_id == me.id or plan.id in self.plan_shares
+
+
+def _resolve(op, perms: _Permissions, me: User):
+    """回傳 (要修改的實體, 失效通知種類與 ID) 或 SyncResult（無法套用）"""
+    if isinstance(op, ItemUpdateOp):
+        item = perms.items.get(op.item_id)
+        if item is None:
+            return SyncResult(op_id=op.op_id, status="not_found", detail="物品不存在")
+        if not perms.can_edit_item(item, me):
+            return SyncResult(op_id=op.op_id, status="forbidden", detail="無編輯權限")
+        return item, (InvalidationKind.item, item.id)
+
+    plan = perms.plans.get(op.plan_id)
+    if plan is None:
+        return SyncResult(op_id=op.op_id, status="not_found", detail="購物計畫不存在")
+    if not perms.can_edit_plan(plan, me):
+        return SyncResult(op_id=op.op_id, status="forbidden", detail="無權限修改")
+    if isinstance(op, PlanUpdateOp):
+        return plan, (InvalidationKind.plan, plan.id)
+
+    plan_item = perms.plan_items.get(op.plan_item_id)
+    if plan_item is None or plan_item.plan_id != plan.id:
+        return SyncResult(op_id=op.op_id, status="not_found", detail="計畫物品不存在")
+    return plan_item, (InvalidationKind.plan, plan.id)
+
+
+def _apply(op, target) -> None:
+    if isinstance(op, PlanItemToggleOp):
+        target.is_done = op.is_done
+    else:
+        for field, val in op.changes.model_dump(exclude_none=True).items():
+            setattr(target, field, val)
+
+
+@router.post("/batch", response_model=SyncBatchOut)
+async def sync_batch(
+    body: SyncBatch,
+    db: AsyncSession = Depends(get_db),
+    me: User = Depends(get_current_user),
+):
+    """依序套用離線操作，回傳每個操作的結果"""
+    perms = await _Permissions.load(body, me, db)
+
+    # 以批次開始前的版本作為衝突判斷基準
+    start_versions: dict[int, int] = {}
+    conflicted: set[int] = set()
+    seen_ops: set[str] = set()
+    invalidations: set[tuple[InvalidationKind, UUID]] = set()
+    results: list[SyncResult] = []
+    applied: list[tuple[SyncResult, object]] = []
+
+    for op in body.operations:
+        if op.op_id in seen_ops:
+            results.append(SyncResult(op_id=op.op_id, status="duplicate"))
+            continue
+        seen_ops.add(op.op_id)
+
+        resolved = _resolve(op, perms, me)
+        if isinstance(resolved, SyncResult):
+            results.append(resolved)
+            continue
+        target, invalidation = resolved
+
+        key = id(target)
+        start_version = start_versions.setdefault(key, target.version)
+        if key in conflicted or (
+            op.base_version is not None and op.base_version != start_version
+        ):
+            conflicted.add(key)
+            results.append(
+                SyncResult(
+                    op_id=op.op_id,
+                    status="conflict",
+                    version=start_version,
+                    detail="資料已被其他人修改",
+                )
+            )
+            continue
+
+        _apply(op, target)
+        invalidations.add(invalidation)
+        result = SyncResult(op_id=op.op_id, status="applied")
+        results.append(result)
+        applied.append((result, target))
+
+    if applied:
+        for kind, obj_id in invalidations:
+            await publish(db, kind, obj_id)
+        # 每個實體只送出一次 UPDATE ... WHERE version = ?
+        await commit_versioned(db)
+        for result, target in applied:
+            result.version = target.version  # expire_on_commit=False，不需重新查詢
+
+    return SyncBatchOut(results=results)
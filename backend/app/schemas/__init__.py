@@ -8,17 +8,41 @@ from .user import (
     InvitationCreate,
     InvitationOut,
     FriendOut,
+    FriendSuggestionOut,
+)
+from .item import (
+    ItemCreate,
+    ItemUpdate,
+    ItemOut,
+    ItemShareCreate,
+    ItemShareOut,
+    ItemImportError,
+    ItemImportResult,
 )
-from .item import ItemCreate, ItemUpdate, ItemOut, ItemShareCreate, ItemShareOut
 from .group import GroupCreate, GroupUpdate, GroupOut, GroupMemberOut, GroupMemberAdd
 from .plan import (
     PlanCreate,
     PlanUpdate,
     PlanOut,
+    PlanDetailOut,
+    PlanItemDetailOut,
     PlanItemToggle,
     PurchaseRecordOut,
     PlanShareCreate,
     PlanShareOut,
+    PlanTemplateCreate,
+    PlanTemplateUpdate,
+    PlanTemplateInstantiate,
+    PlanTemplateOut,
+)
+from .suggestion import SuggestionOut, SuggestionAccept
+from .sync import (
+    SyncBatch,
+    SyncBatchOut,
+    SyncResult,
+    ItemUpdateOp,
+    PlanUpdateOp,
+    PlanItemToggleOp,
 )
 
 __all__ = [
@@ -31,11 +55,14 @@ __all__ = [
     "InvitationCreate",
     "InvitationOut",
     "FriendOut",
+    "FriendSuggestionOut",
     "ItemCreate",
     "ItemUpdate",
     "ItemOut",
     "ItemShareCreate",
     "ItemShareOut",
+    "ItemImportError",
+    "ItemImportResult",
     "GroupCreate",
     "GroupUpdate",
     "GroupOut",
@@ -44,8 +71,22 @@ __all__ = [
     "PlanCreate",
     "PlanUpdate",
     "PlanOut",
+    "PlanDetailOut",
+    "PlanItemDetailOut",
     "PlanItemToggle",
     "PurchaseRecordOut",
     "PlanShareCreate",
     "PlanShareOut",
+    "PlanTemplateCreate",
+    "PlanTemplateUpdate",
+    "PlanTemplateInstantiate",
+    "PlanTemplateOut",
+    "SuggestionOut",
+    "SuggestionAccept",
+    "SyncBatch",
+    "SyncBatchOut",
+    "SyncResult",
+    "ItemUpdateOp",
+    "PlanUpdateOp",
+    "PlanItemToggleOp",
 ]
@@ -39,7 +39,10 @@ class ItemOut(BaseModel):
     note: str | None
     created_at: datetime
     updated_at: datetime
+    version: int = 1
+    archived_at: datetime | None = None  # 已封存的已購買物品
     is_shared: bool = False  # 是否為被分享的物品
+    price_estimate: Decimal | None = None  # 依購買紀錄的預估價格
 
     model_config = {"from_attributes": True}
 
@@ -57,3 +60,14 @@ class ItemShareOut(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class ItemImportError(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class ItemImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: list[ItemImportError] = []
@@ -3,6 +3,7 @@ from uuid import UUID
 from datetime import date, datetime
 from decimal import Decimal
 from pydantic import BaseModel, Field
+from app.models.item import ItemCategory
 from app.models.plan import PlanStatus, PlanSharePermission
 
 
@@ -27,6 +28,7 @@ class PlanItemOut(BaseModel):
     id: UUID
     item_id: UUID
     is_done: bool
+    version: int = 1
 
     model_config = {"from_attributes": True}
 
@@ -40,12 +42,33 @@ class PlanOut(BaseModel):
     status: PlanStatus
     created_at: datetime
     completed_at: datetime | None
+    version: int = 1
     plan_items: list[PlanItemOut] = []
     is_shared: bool = False  # 是否為被分享的計畫
 
     model_config = {"from_attributes": True}
 
 
+class PlanItemDetailOut(BaseModel):
+    """計畫物品 + 物品欄位（單次 JOIN 查詢）"""
+
+    id: UUID
+    item_id: UUID
+    is_done: bool
+    name: str
+    quantity: int
+    est_price: Decimal | None
+    category: ItemCategory
+    brand_note: str | None
+
+    model_config = {"from_attributes": True}
+
+
+class PlanDetailOut(PlanOut):
+    plan_items: list[PlanItemDetailOut] = []
+    est_total: Decimal = Decimal("0")  # 預估總金額（SQL 計算）
+
+
 class PurchaseRecordOut(BaseModel):
     id: UUID
     plan_id: UUID
@@ -72,3 +95,36 @@ class PlanShareOut(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class PlanTemplateCreate(BaseModel):
+    """將既有計畫存為範本；設定 recurrence_days 時自 next_run_on 起週期產生"""
+
+    plan_id: UUID
+    name: str | None = Field(default=None, max_length=200)  # 預設沿用計畫名稱
+    recurrence_days: int | None = Field(default=None, ge=1, le=366)
+    next_run_on: date | None = None
+
+
+class PlanTemplateUpdate(BaseModel):
+    name: str | None = Field(default=None, max_length=200)
+    recurrence_days: int | None = Field(default=None, ge=1, le=366)
+    next_run_on: date | None = None
+
+
+class PlanTemplateInstantiate(BaseModel):
+    name: str | None = Field(default=None, max_length=200)  # 預設沿用範本名稱
+    exec_date: date | None = None
+
+
+class PlanTemplateOut(BaseModel):
+    id: UUID
+    name: str
+    creator_id: UUID
+    group_id: UUID | None
+    recurrence_days: int | None
+    next_run_on: date | None
+    created_at: datetime
+    item_count: int = 0
+
+    model_config = {"from_attributes": True}
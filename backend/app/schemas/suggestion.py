@@ -0,0 +1,23 @@
+from __future__ import annotations
+from uuid import UUID
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class SuggestionOut(BaseModel):
+    scope_type: str          # user | group
+    scope_id: UUID
+    name_key: str
+    display_name: str
+    category: str | None
+    last_quantity: int
+    purchase_count: int
+    avg_interval_days: float | None
+    last_purchased_at: datetime
+    next_due_at: datetime | None
+
+    model_config = {"from_attributes": True}
+
+
+class SuggestionAccept(BaseModel):
+    name_keys: list[str] = Field(min_length=1)  # 要加入計畫的建議（正規化名稱）
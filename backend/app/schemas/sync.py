@@ -0,0 +1,52 @@
+from __future__ import annotations
+from typing import Annotated, Literal, Union
+from uuid import UUID
+from pydantic import BaseModel, Field
+from app.schemas.item import ItemUpdate
+from app.schemas.plan import PlanUpdate
+
+
+class _SyncOpBase(BaseModel):
+    op_id: str = Field(min_length=1, max_length=100)  # 用戶端產生的操作 ID
+    base_version: int | None = None  # 離線時看到的版本；不符即視為衝突
+
+
+class ItemUpdateOp(_SyncOpBase):
+    type: Literal["item.update"]
+    item_id: UUID
+    changes: ItemUpdate
+
+
+class PlanUpdateOp(_SyncOpBase):
+    type: Literal["plan.update"]
+    plan_id: UUID
+    changes: PlanUpdate
+
+
+class PlanItemToggleOp(_SyncOpBase):
+    type: Literal["plan_item.toggle"]
+    plan_id: UUID
+    plan_item_id: UUID
+    is_done: bool
+
+
+SyncOperation = Annotated[
+    Union[ItemUpdateOp, PlanUpdateOp, PlanItemToggleOp],
+    Field(discriminator="type"),
+]
+
+
+class SyncBatch(BaseModel):
+    operations: list[SyncOperation] = Field(max_length=500)
+
+
+class SyncResult(BaseModel):
+    op_id: str
+    # applied | conflict | forbidden | not_found | duplicate
+    status: str
+    version: int | None = None  # 操作後（或衝突時伺服器端）的版本
+    detail: str | None = None
+
+
+class SyncBatchOut(BaseModel):
+    results: list[SyncResult]
@@ -51,6 +51,13 @@ class FriendOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class FriendSuggestionOut(BaseModel):
+    id: UUID
+    name: str
+    mutual_friends: int
+    shared_groups: int
+
+
 # ── 邀請 ─────────────────────────────────────────────────────────────────
 class InvitationCreate(BaseModel):
     invitee_email: EmailStr
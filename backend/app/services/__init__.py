@@ -1,3 +1,22 @@
 from .email import send_invitation_email
+from .item_import import import_items
+from .maintenance import MaintenanceScheduler, maintenance_job
+from .partitions import ensure_partitions
+from .visibility import sync_items, sync_plans
+from .friend_suggestions import mark_friendship_changed, mark_group_changed
+from .reads import ItemRow, PlanRow, GroupRow
 
-__all__ = ["send_invitation_email"]
+__all__ = [
+    "send_invitation_email",
+    "import_items",
+    "MaintenanceScheduler",
+    "maintenance_job",
+    "ensure_partitions",
+    "sync_items",
+    "sync_plans",
+    "mark_friendship_changed",
+    "mark_group_changed",
+    "ItemRow",
+    "PlanRow",
+    "GroupRow",
+]
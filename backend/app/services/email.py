@@ -1,10 +1,6 @@
 """
 SMTP 郵件服務：非同步發送邀請信
 """
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-
 from app.core.config import settings
 
 
@@ -54,6 +50,11 @@ def send_invitation_email(to_email: str, inviter_name: str, token: str) -> None:
         print(f"[DEV] 邀請連結 → {register_url}")
         return
 
+    # SMTP / MIME 只在實際寄信時載入
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
     msg = MIMEMultipart("alternative")
     msg["Subject"] = f"{inviter_name} 邀請您加入家庭購物清單"
     msg["From"]    = settings.SMTP_FROM
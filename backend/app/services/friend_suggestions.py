@@ -0,0 +1,177 @@
+"""
+好友推薦：依共同好友數與共同群組數排名，背景增量計算後存入 friend_suggestions
+
+好友關係或群組成員異動時以 mark_stale 將受影響使用者排入佇列（同一交易），
+維護排程每輪取出一批重新計算；每位使用者的計算量受
+FRIEND_SUGGESTION_MAX_FRIENDS / MAX_GROUPS / LIMIT 限制。
+"""
+import logging
+from datetime import datetime
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.models.user import Friendship, FriendSuggestion, FriendSuggestionQueue
+from app.models.group import GroupMember
+from app.services.maintenance import maintenance_job
+
+logger = logging.getLogger(__name__)
+
+
+def _friend_ids(*user_ids: UUID):
+    """已接受的好友（兩個方向皆查，各自走索引）"""
+    return select(Friendship.addressee_id.label("friend_id")).where(
+        Friendship.requester_id.in_(user_ids), Friendship.status == "accepted"
+    ).union(
+        select(Friendship.requester_id).where(
+            Friendship.addressee_id.in_(user_ids), Friendship.status == "accepted"
+        )
+    )
+
+
+async def mark_stale(db: AsyncSession, user_ids: Iterable[UUID]) -> None:
+    """將使用者排入重新計算佇列（於呼叫端交易中）"""
+    rows = [{"user_id": uid} for uid in set(user_ids)]
+    if rows:
+        await db.execute(insert(FriendSuggestionQueue), rows)
+
+
+async def mark_friendship_changed(db: AsyncSession, a: UUID, b: UUID) -> None:
+    """a、b 本身及其好友的共同好友數都會改變"""
+    friends = (
+        await db.execute(
+            _friend_ids(a, b).limit(settings.FRIEND_SUGGESTION_MAX_FRIENDS * 2)
+        )
+    ).scalars()
+    await mark_stale(db, [a, b, *friends])
+
+
+async def mark_group_changed(db: AsyncSession, group_id: UUID, *extra: UUID) -> None:
+    """群組所有成員（與剛離開的成員）的共同群組數都會改變"""
+    await db.flush()
+    await db.execute(
+        insert(FriendSuggestionQueue).from_select(
+            ["user_id"],
+            select(GroupMember.user_id).where(GroupMember.group_id == group_id),
+        )
+    )
+    await mark_stale(db, extra)
+
+
+async def refresh_user(conn: AsyncConnection, user_id: UUID) -> int:
+    """重新計算單一使用者的推薦，回傳筆數"""
+    limit = settings.FRIEND_SUGGESTION_LIMIT
+    friends = _friend_ids(user_id).limit(settings.FRIEND_SUGGESTION_MAX_FRIENDS)
+    friends = friends.subquery()
+    # 已有任何好友關係（含 pending / rejected）的對象不再推薦
+    related = select(Friendship.addressee_id).where(
+        Friendship.requester_id == user_id
+    ).union(
+        select(Friendship.requester_id).where(Friendship.addressee_id == user_id)
+    )
+
+    # 好友的好友：好友關係雙向儲存，以 requester_id 主鍵前綴展開即可
+    mutual = (
+        await conn.execute(
+            select(
+                Friendship.addressee_id.label("candidate"),
+                func.count().label("n"),
+            )
+            .where(
+                Friendship.requester_id.in_(select(friends.c.friend_id)),
+                Friendship.status == "accepted",
+                Friendship.addressee_id != user_id,
+                Friendship.addressee_id.not_in(related),
+            )
+            .group_by(Friendship.addressee_id)
+            .order_by(func.count().desc())
+            .limit(limit)
+        )
+    ).all()
+
+    my_groups = (
+        select(GroupMember.group_id)
+        .where(GroupMember.user_id == user_id)
+        .limit(settings.FRIEND_SUGGESTION_MAX_GROUPS)
+    )
+    shared = (
+        await conn.execute(
+            select(GroupMember.user_id.label("candidate"), func.count().label("n"))
+            .where(
+                GroupMember.group_id.in_(my_groups),
+                GroupMember.user_id != user_id,
+                GroupMember.user_id.not_in(related),
+            )
+            .group_by(GroupMember.user_id)
+            .order_by(func.count().desc())
+            .limit(limit)
+        )
+    ).all()
+
+    scores: dict[UUID, list[int]] = {}
+    for row in mutual:
+        scores.setdefault(row.candidate, [0, 0])[0] = row.n
+    for row in shared:
+        scores.setdefault(row.candidate, [0, 0])[1] = row.n
+    # 共同好友數優先，其次共同群組數；同分以 id 排序確保結果穩定
+    ranked = sorted(
+        scores.items(), key=lambda kv: (-kv[1][0], -kv[1][1], str(kv[0]))
+    )[:limit]
+    now = datetime.utcnow()
+
+    await conn.execute(
+        delete(FriendSuggestion).where(FriendSuggestion.user_id == user_id)
+    )
+    if ranked:
+        await conn.execute(
+            insert(FriendSuggestion),
+            [
+                {
+                    "user_id": user_id,
+                    "candidate_id": candidate,
+                    "rank": rank,
+                    "mutual_friends": n_mutual,
+                    "shared_groups": n_shared,
+                    "refreshed_at": now,
+                }
+                for rank, (candidate, (n_mutual, n_shared)) in enumerate(
+                    ranked, start=1
+                )
+            ],
+        )
+    return len(ranked)
+
+
+@maintenance_job(
+    "refresh_friend_suggestions", settings.FRIEND_SUGGESTION_INTERVAL_SECONDS
+)
+async def refresh_friend_suggestions(engine: AsyncEngine) -> None:
+    """處理佇列：每位使用者一個交易，重複排入的項目合併為一次計算"""
+    async with engine.connect() as conn:
+        pending = (
+            await conn.execute(
+                select(
+                    FriendSuggestionQueue.user_id,
+                    func.max(FriendSuggestionQueue.id).label("last_id"),
+                )
+                .group_by(FriendSuggestionQueue.user_id)
+                .order_by(func.min(FriendSuggestionQueue.id))
+                .limit(settings.FRIEND_SUGGESTION_BATCH_SIZE)
+            )
+        ).all()
+
+    for user_id, last_id in pending:
+        async with engine.begin() as conn:
+            await refresh_user(conn, user_id)
+            # 計算期間新排入的項目（id > last_id）保留到下一輪
+            await conn.execute(
+                delete(FriendSuggestionQueue).where(
+                    FriendSuggestionQueue.user_id == user_id,
+                    FriendSuggestionQueue.id <= last_id,
+                )
+            )
+    if pending:
+        logger.info(f"Refreshed friend suggestions for {len(pending)} users")
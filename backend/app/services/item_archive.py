@@ -0,0 +1,78 @@
+"""
+已購買物品封存層
+
+已購買超過 ITEM_ARCHIVE_AFTER_DAYS 的物品由背景工作標記 archived_at，
+預設列表不再回傳（?archived=true 另行查詢）。物品留在 items 表中，
+計畫明細、分享與購買紀錄的關聯都不受影響；狀態再次變更時即離開封存層
+（models/item.py 的 _unarchive_on_status_change）。
+
+ITEM_ACTIVE 的兩個分支分別對應 Item 上的兩個部分索引，PostgreSQL 以 BitmapOr
+合併。'purchased' 以 literal_execute 內嵌於語句中：部分索引的條件需在規劃時
+即可證明成立，綁定參數的 generic plan 無法使用部分索引。
+"""
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.models.item import Item, ItemStatus
+from app.services.maintenance import maintenance_job, vacuum_analyze
+
+logger = logging.getLogger(__name__)
+
+_PURCHASED = literal(ItemStatus.purchased, Item.status.type, literal_execute=True)
+
+ITEM_ACTIVE = or_(
+    Item.status != _PURCHASED,
+    and_(Item.status == _PURCHASED, Item.archived_at.is_(None)),
+)
+ITEM_ARCHIVED = and_(Item.status == _PURCHASED, Item.archived_at.is_not(None))
+
+
+def item_scope(archived: bool):
+    return ITEM_ARCHIVED if archived else ITEM_ACTIVE
+
+
+@maintenance_job("archive_purchased_items", settings.ITEM_ARCHIVE_INTERVAL_SECONDS)
+async def archive_purchased_items(engine: AsyncEngine) -> None:
+    """分批標記，每批獨立交易；不更動 updated_at 與 version"""
+    if settings.ITEM_ARCHIVE_AFTER_DAYS <= 0:
+        return
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=settings.ITEM_ARCHIVE_AFTER_DAYS)
+    batch_size = settings.MAINTENANCE_BATCH_SIZE
+    total = 0
+    for _ in range(settings.MAINTENANCE_MAX_BATCHES):
+        async with engine.begin() as conn:
+            ids = (
+                (
+                    await conn.execute(
+                        select(Item.id)
+                        .where(
+                            Item.status == _PURCHASED,
+                            Item.archived_at.is_(None),
+                            Item.updated_at < cutoff,
+                        )
+                        .limit(batch_size)
+                    )
+                )
+                .scalars()
+                .all()
+            )
+            if ids:
+                await conn.execute(
+                    update(Item)
+                    .where(Item.id.in_(ids))
+                    .values(archived_at=now, updated_at=Item.updated_at)
+                )
+        total += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    if total:
+        logger.info(f"Archived {total} purchased items")
+    if total >= settings.MAINTENANCE_VACUUM_THRESHOLD:
+        # 部分索引的項目被移除，回收 dead tuples
+        await vacuum_analyze(engine, Item.__tablename__)
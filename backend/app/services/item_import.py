@@ -0,0 +1,144 @@
+"""
+物品批次匯入：逐列串流解析 CSV / NDJSON，驗證後以 COPY（或多列 INSERT）寫入
+"""
+import asyncio
+import csv
+import json
+import uuid
+from datetime import datetime
+from itertools import islice
+from typing import Any, BinaryIO, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.item import Item, ItemStatus
+from app.schemas import ItemCreate
+from app.services.visibility import sync_items
+
+COPY_COLUMNS = (
+    "id",
+    "owner_id",
+    "group_id",
+    "name",
+    "quantity",
+    "est_price",
+    "category",
+    "status",
+    "brand_note",
+    "note",
+    "created_at",
+    "updated_at",
+)
+
+
+class ImportDecodeError(ValueError):
+    """上傳檔案含非 UTF-8 內容，整批匯入中止"""
+
+    def __init__(self, row: int):
+        super().__init__(f"第 {row} 列不是有效的 UTF-8 編碼")
+        self.row = row
+
+
+def _decoded_lines(fileobj: BinaryIO) -> Iterator[str]:
+    """逐行解碼，解碼失敗時能指出確切列號"""
+    for line_no, raw in enumerate(fileobj, start=1):
+        try:
+            yield raw.decode("utf-8-sig" if line_no == 1 else "utf-8")
+        except UnicodeDecodeError:
+            raise ImportDecodeError(line_no) from None
+
+
+def iter_rows(fileobj: BinaryIO, fmt: str) -> Iterator[tuple[int, Any]]:
+    """逐列讀取上傳檔案（不將整個檔案載入記憶體），回傳 (列號, 原始資料)"""
+    lines = _decoded_lines(fileobj)
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            # 空字串視為未填
+            yield reader.line_num, {k: v for k, v in row.items() if k and v != ""}
+    else:
+        for line_no, line in enumerate(lines, start=1):
+            if line.strip():
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_no, e
+
+
+def _validate(raw: Any) -> ItemCreate | list[str]:
+    """合法時回傳 ItemCreate，否則回傳錯誤訊息"""
+    if isinstance(raw, json.JSONDecodeError):
+        return [f"JSON 格式錯誤：{raw.msg}"]
+    try:
+        return ItemCreate.model_validate(raw)
+    except ValidationError as e:
+        return [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()]
+
+
+def _parse_batch(rows: Iterator[tuple[int, Any]], size: int) -> list[tuple]:
+    """於 worker thread 執行：解碼、解析與驗證至多 size 列"""
+    return [(line_no, _validate(raw)) for line_no, raw in islice(rows, size)]
+
+
+def _to_record(body: ItemCreate, owner_id: uuid.UUID, now: datetime) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "owner_id": owner_id,
+        "status": ItemStatus.pending,
+        "created_at": now,
+        "updated_at": now,
+        **body.model_dump(),
+    }
+
+
+async def _flush(db: AsyncSession, batch: list[dict]) -> None:
+    if not batch:
+        return
+    conn = await db.connection()
+    if conn.dialect.name == "postgresql" and conn.dialect.driver == "asyncpg":
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            Item.__tablename__,
+            columns=COPY_COLUMNS,
+            records=[
+                tuple(
+                    r[c].value if c in ("category", "status") else r[c]
+                    for c in COPY_COLUMNS
+                )
+                for r in batch
+            ],
+        )
+    else:
+        await db.execute(insert(Item), batch)
+    await sync_items(db, Item.id.in_([r["id"] for r in batch]))
+
+
+async def import_items(
+    db: AsyncSession, fileobj: BinaryIO, fmt: str, owner_id: uuid.UUID
+) -> dict:
+    """驗證並分批寫入；所有批次於呼叫端的同一交易中完成
+
+    解析與驗證為 CPU 工作，每批交由 worker thread 處理，不阻塞事件迴圈；
+    檔案含非 UTF-8 內容時拋出 ImportDecodeError。
+    """
+    imported, failed, errors = 0, 0, []
+    now = datetime.utcnow()
+    rows = iter_rows(fileobj, fmt)
+
+    while parsed := await asyncio.to_thread(
+        _parse_batch, rows, settings.IMPORT_BATCH_SIZE
+    ):
+        batch: list[dict] = []
+        for line_no, result in parsed:
+            if isinstance(result, ItemCreate):
+                batch.append(_to_record(result, owner_id, now))
+                continue
+            failed += 1
+            if len(errors) < settings.IMPORT_MAX_ERRORS:
+                errors.append({"row": line_no, "errors": result})
+        await _flush(db, batch)
+        imported += len(batch)
+    return {"imported": imported, "failed": failed, "errors": errors}
@@ -0,0 +1,212 @@
+"""
+背景維護排程：以 PostgreSQL advisory lock 選出單一 leader 執行週期性清理工作
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.models.user import InvitationToken
+from app.models.ratelimit import RateLimitBucket
+from app.models.idempotency import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+# 任意固定的 64-bit key，所有 worker 競爭同一把鎖
+MAINTENANCE_LOCK_KEY = 0x5348_4F50_4D41_494E  # "SHOPMAIN"
+
+JobFunc = Callable[[AsyncEngine], Awaitable[None]]
+
+
+@dataclass
+class MaintenanceJob:
+    name: str
+    func: JobFunc
+    interval: timedelta
+    last_run: datetime | None = None
+
+    def is_due(self, now: datetime) -> bool:
+        return self.last_run is None or now - self.last_run >= self.interval
+
+
+_jobs: dict[str, MaintenanceJob] = {}
+
+
+def maintenance_job(name: str, interval_seconds: int):
+    """註冊維護工作：`@maintenance_job("purge_x", 3600)`"""
+
+    def decorator(func: JobFunc) -> JobFunc:
+        _jobs[name] = MaintenanceJob(
+            name=name, func=func, interval=timedelta(seconds=interval_seconds)
+        )
+        return func
+
+    return decorator
+
+
+def registered_jobs() -> list[MaintenanceJob]:
+    return list(_jobs.values())
+
+
+async def vacuum_analyze(engine: AsyncEngine, table: str) -> None:
+    """大量刪除後回收 dead tuples，避免索引膨脹（VACUUM 不可於交易中執行）"""
+    if engine.dialect.name != "postgresql":
+        return
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(f"VACUUM (ANALYZE) {table}"))
+
+
+class MaintenanceScheduler:
+    def __init__(self, engine: AsyncEngine):
+        self._engine = engine
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="maintenance")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_due_jobs(self) -> None:
+        now = datetime.utcnow()
+        for job in registered_jobs():
+            if not job.is_due(now):
+                continue
+            try:
+                logger.debug(f"Maintenance job start: {job.name}")
+                await job.func(self._engine)
+            except Exception:
+                logger.exception(f"Maintenance job failed: {job.name}")
+            job.last_run = now
+
+    async def _lead(self) -> None:
+        """持有鎖期間持續執行；連線失效時拋出例外，交由外層重新競選"""
+        interval = settings.MAINTENANCE_TICK_SECONDS
+        if self._engine.dialect.name != "postgresql":
+            # 單節點資料庫（如 SQLite）不需選主
+            while True:
+                await self.run_due_jobs()
+                await asyncio.sleep(interval)
+
+        async with self._engine.connect() as lock_conn:
+            acquired = (
+                await lock_conn.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"),
+                    {"key": MAINTENANCE_LOCK_KEY},
+                )
+            ).scalar()
+            await lock_conn.commit()  # session-level lock 不需保持交易開啟
+            if not acquired:
+                return
+            logger.info("Maintenance leader elected in this worker")
+            try:
+                while True:
+                    await self.run_due_jobs()
+                    await asyncio.sleep(interval)
+                    await lock_conn.execute(text("SELECT 1"))  # 確認鎖仍由本連線持有
+                    await lock_conn.commit()
+            finally:
+                try:
+                    await asyncio.shield(
+                        lock_conn.execute(
+                            text("SELECT pg_advisory_unlock(:key)"),
+                            {"key": MAINTENANCE_LOCK_KEY},
+                        )
+                    )
+                except Exception:
+                    # 連線已中斷時鎖會由 PostgreSQL 自動釋放
+                    pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._lead()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Maintenance scheduler error")
+            await asyncio.sleep(settings.MAINTENANCE_TICK_SECONDS)
+
+
+# ── 內建工作 ─────────────────────────────────────────────────────────────
+@maintenance_job("purge_expired_invitations", settings.INVITATION_PURGE_INTERVAL_SECONDS)
+async def purge_expired_invitations(engine: AsyncEngine) -> None:
+    """分批刪除過期超過保留期的邀請 token，每批獨立交易以縮短鎖定時間"""
+    cutoff = datetime.utcnow() - timedelta(days=settings.INVITATION_RETENTION_DAYS)
+    batch_size = settings.MAINTENANCE_BATCH_SIZE
+    total = 0
+    for _ in range(settings.MAINTENANCE_MAX_BATCHES):
+        async with engine.begin() as conn:
+            ids = (
+                (
+                    await conn.execute(
+                        select(InvitationToken.id)
+                        .where(InvitationToken.expires_at < cutoff)
+                        .limit(batch_size)
+                    )
+                )
+                .scalars()
+                .all()
+            )
+            if ids:
+                await conn.execute(
+                    delete(InvitationToken).where(InvitationToken.id.in_(ids))
+                )
+        total += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    if total:
+        logger.info(f"Purged {total} expired invitation tokens")
+    if total >= settings.MAINTENANCE_VACUUM_THRESHOLD:
+        await vacuum_analyze(engine, InvitationToken.__tablename__)
+
+
+@maintenance_job("purge_stale_rate_limit_buckets", 3600)
+async def purge_stale_rate_limit_buckets(engine: AsyncEngine) -> None:
+    """postgres 限流後端：閒置一天以上的 bucket 必然已補滿，可直接刪除"""
+    if settings.RATE_LIMIT_BACKEND != "postgres":
+        return
+    cutoff = datetime.utcnow() - timedelta(days=1)
+    async with engine.begin() as conn:
+        await conn.execute(
+            delete(RateLimitBucket).where(RateLimitBucket.updated_at < cutoff)
+        )
+
+
+@maintenance_job("purge_expired_idempotency_keys", 3600)
+async def purge_expired_idempotency_keys(engine: AsyncEngine) -> None:
+    now = datetime.utcnow()
+    for _ in range(settings.MAINTENANCE_MAX_BATCHES):
+        async with engine.begin() as conn:
+            ids = (
+                (
+                    await conn.execute(
+                        select(IdempotencyKey.key)
+                        .where(IdempotencyKey.expires_at < now)
+                        .limit(settings.MAINTENANCE_BATCH_SIZE)
+                    )
+                )
+                .scalars()
+                .all()
+            )
+            if ids:
+                await conn.execute(
+                    delete(IdempotencyKey).where(IdempotencyKey.key.in_(ids))
+                )
+        if len(ids) < settings.MAINTENANCE_BATCH_SIZE:
+            break
@@ -0,0 +1,154 @@
+"""
+purchase_records 月分區管理：預先建立未來分區、將過舊分區 DETACH 後封存
+
+DEFAULT 分區接住沒有對應月分區的資料（如維護工作停擺跨月），寫入不會失敗；
+下次 ensure_partitions 會為其中出現的月份補建分區並把資料搬過去。
+"""
+import logging
+import re
+from datetime import date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import settings
+from app.models.plan import PurchaseRecord, PurchaseRecordArchive
+from app.services.maintenance import maintenance_job
+
+logger = logging.getLogger(__name__)
+
+PARENT = PurchaseRecord.__tablename__
+DEFAULT = f"{PARENT}_default"
+_PARTITION_RE = re.compile(rf"^{PARENT}_p(\d{{4}})(\d{{2}})$")
+
+
+def _add_months(d: date, months: int) -> date:
+    total = d.year * 12 + d.month - 1 + months
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"{PARENT}_p{month:%Y%m}"
+
+
+async def _list_partitions(conn: AsyncConnection) -> dict[date, str]:
+    rows = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :parent"
+        ),
+        {"parent": PARENT},
+    )
+    partitions = {}
+    for (name,) in rows:
+        m = _PARTITION_RE.match(name)
+        if m:
+            partitions[date(int(m[1]), int(m[2]), 1)] = name
+    return partitions
+
+
+async def _create_partition(conn: AsyncConnection, start: date) -> None:
+    """DEFAULT 分區已有該月資料時無法直接 PARTITION OF，先建表搬移後再 ATTACH"""
+    name, end = _partition_name(start), _add_months(start, 1)
+    await conn.execute(
+        text(
+            f"CREATE TABLE {name} "
+            f"(LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    moved = await conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT} "
+            "WHERE purchased_at >= :start AND purchased_at < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"start": start, "end": end},
+    )
+    # 索引、主鍵與外鍵於 ATTACH 時自父表建立
+    await conn.execute(
+        text(
+            f"ALTER TABLE {PARENT} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    )
+    logger.info(f"Created partition {name} ({moved.rowcount} rows from {DEFAULT})")
+
+
+async def ensure_partitions(conn: AsyncConnection) -> None:
+    """建立缺少的分區（已存在則略過）
+
+    包含 DEFAULT 分區、本月起算 PURCHASE_RECORD_PREMAKE_MONTHS 個月，
+    以及 DEFAULT 中已有資料的月份。
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    await conn.execute(
+        text(f"CREATE TABLE IF NOT EXISTS {DEFAULT} PARTITION OF {PARENT} DEFAULT")
+    )
+    this_month = datetime.utcnow().date().replace(day=1)
+    months = {
+        _add_months(this_month, offset)
+        for offset in range(settings.PURCHASE_RECORD_PREMAKE_MONTHS + 1)
+    }
+    months.update(
+        (
+            await conn.execute(
+                text(
+                    "SELECT DISTINCT CAST(date_trunc('month', purchased_at) AS date) "
+                    f"FROM {DEFAULT}"
+                )
+            )
+        ).scalars()
+    )
+    existing = await _list_partitions(conn)
+    for start in sorted(months - existing.keys()):
+        await _create_partition(conn, start)
+
+
+async def archive_partition(conn: AsyncConnection, month: date, name: str) -> int:
+    """DETACH 單一分區，依計畫彙整為 JSON 寫入封存表後刪除該分區"""
+    await conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+    result = await conn.execute(
+        text(
+            f"INSERT INTO {PurchaseRecordArchive.__tablename__} "
+            "(id, plan_id, month, record_count, records, archived_at) "
+            "SELECT gen_random_uuid(), plan_id, :month, count(*), "
+            "jsonb_agg(jsonb_build_object("
+            "'id', id, 'plan_id', plan_id, 'item_name', item_name, "
+            "'quantity', quantity, 'actual_price', actual_price, "
+            "'category', category, 'note', note, 'purchased_at', purchased_at"
+            ") ORDER BY purchased_at), now() at time zone 'utc' "
+            f"FROM {name} GROUP BY plan_id"
+        ),
+        {"month": month},
+    )
+    await conn.execute(text(f"DROP TABLE {name}"))
+    return result.rowcount
+
+
+@maintenance_job("ensure_purchase_record_partitions", 6 * 3600)
+async def ensure_partitions_job(engine: AsyncEngine) -> None:
+    if engine.dialect.name != "postgresql":
+        return
+    async with engine.begin() as conn:
+        await ensure_partitions(conn)
+
+
+@maintenance_job("archive_purchase_record_partitions", 24 * 3600)
+async def archive_partitions_job(engine: AsyncEngine) -> None:
+    """封存早於 PURCHASE_RECORD_ARCHIVE_AFTER_MONTHS 個月的分區（0 表示停用）"""
+    keep = settings.PURCHASE_RECORD_ARCHIVE_AFTER_MONTHS
+    if engine.dialect.name != "postgresql" or keep <= 0:
+        return
+    cutoff = _add_months(datetime.utcnow().date().replace(day=1), -keep)
+    async with engine.connect() as conn:
+        partitions = await _list_partitions(conn)
+    for month, name in sorted(partitions.items()):
+        if month >= cutoff:
+            break
+        # 每個分區獨立交易
+        async with engine.begin() as conn:
+            rows = await archive_partition(conn, month, name)
+        logger.info(f"Archived partition {name} into {rows} archive rows")
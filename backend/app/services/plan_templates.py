@@ -0,0 +1,191 @@
+"""
+計畫範本：由既有計畫儲存範本，並以 INSERT ... SELECT 一次產生新計畫
+
+產生計畫只需固定數量的語句（與物品數無關）：
+  1. 新增 shopping_plans 一列
+  2. INSERT INTO plan_items SELECT ... FROM plan_template_items
+  3. UPDATE items SET status = 'shopping' WHERE id IN (範本物品)
+週期範本由 materialize_recurring_plans 背景工作於 next_run_on 到期時產生。
+"""
+import logging
+import uuid
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import false, func, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.models.item import Item, ItemStatus
+from app.models.plan import (
+    PlanItem,
+    PlanStatus,
+    PlanTemplate,
+    PlanTemplateItem,
+    ShoppingPlan,
+)
+from app.services.maintenance import maintenance_job
+from app.services.visibility import sync_plans
+
+logger = logging.getLogger(__name__)
+
+
+def _new_uuid(db: AsyncSession):
+    """INSERT ... SELECT 中由資料庫產生主鍵"""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.gen_random_uuid()
+    # SQLite：Uuid 以 32 位十六進位字串儲存
+    return func.lower(func.hex(func.randomblob(16)))
+
+
+def first_run_on(recurrence_days: int | None, next_run_on: date | None):
+    """未指定起始日時，自今天起一個週期後首次產生"""
+    if recurrence_days is None:
+        return None
+    return next_run_on or datetime.utcnow().date() + timedelta(days=recurrence_days)
+
+
+async def save_template(
+    db: AsyncSession,
+    plan: ShoppingPlan,
+    *,
+    name: str | None = None,
+    recurrence_days: int | None = None,
+    next_run_on: date | None = None,
+) -> PlanTemplate:
+    """以計畫目前的物品建立範本（於呼叫端交易中）"""
+    template = PlanTemplate(
+        name=name or plan.name,
+        creator_id=plan.creator_id,
+        group_id=plan.group_id,
+        recurrence_days=recurrence_days,
+        next_run_on=first_run_on(recurrence_days, next_run_on),
+    )
+    db.add(template)
+    await db.flush()
+    await db.execute(
+        insert(PlanTemplateItem).from_select(
+            ["template_id", "item_id"],
+            select(
+                literal(template.id, PlanTemplateItem.template_id.type),
+                PlanItem.item_id,
+            )
+            .where(PlanItem.plan_id == plan.id)
+            .distinct(),
+        )
+    )
+    return template
+
+
+async def count_items(db: AsyncSession, template_ids: list) -> dict:
+    if not template_ids:
+        return {}
+    rows = await db.execute(
+        select(PlanTemplateItem.template_id, func.count())
+        .where(PlanTemplateItem.template_id.in_(template_ids))
+        .group_by(PlanTemplateItem.template_id)
+    )
+    return dict(rows.all())
+
+
+async def instantiate(
+    db: AsyncSession,
+    template: PlanTemplate,
+    *,
+    name: str | None = None,
+    exec_date: date | None = None,
+) -> uuid.UUID:
+    """依範本產生計畫並回傳其 id（於呼叫端交易中）"""
+    plan_id = uuid.uuid4()
+    now = datetime.utcnow()
+    await db.execute(
+        insert(ShoppingPlan).values(
+            id=plan_id,
+            name=name or template.name,
+            creator_id=template.creator_id,
+            group_id=template.group_id,
+            exec_date=exec_date,
+            status=PlanStatus.ongoing,
+            created_at=now,
+        )
+    )
+
+    # 與 create_plan 相同：只納入建立者自己的物品
+    item_ids = (
+        select(PlanTemplateItem.item_id)
+        .join(Item, Item.id == PlanTemplateItem.item_id)
+        .where(
+            PlanTemplateItem.template_id == template.id,
+            Item.owner_id == template.creator_id,
+        )
+    )
+    source = item_ids.subquery()
+    await db.execute(
+        insert(PlanItem).from_select(
+            ["id", "plan_id", "item_id", "is_done"],
+            select(
+                _new_uuid(db),
+                literal(plan_id, PlanItem.plan_id.type),
+                source.c.item_id,
+                false(),
+            ),
+        )
+    )
+    # 已購買的物品重新標記為購物中並離開封存層；批次更新不經 ORM，版本需自行遞增
+    await db.execute(
+        update(Item)
+        .where(Item.id.in_(item_ids), Item.status != ItemStatus.shopping)
+        .values(
+            status=ItemStatus.shopping,
+            archived_at=None,
+            version=Item.version + 1,
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await sync_plans(db, ShoppingPlan.id == plan_id)
+    return plan_id
+
+
+# ── 週期計畫 ─────────────────────────────────────────────────────────────
+@maintenance_job(
+    "materialize_recurring_plans", settings.PLAN_RECURRENCE_INTERVAL_SECONDS
+)
+async def materialize_recurring_plans(engine: AsyncEngine) -> None:
+    """到期的週期範本各產生一份計畫，每個範本一個交易"""
+    today = datetime.utcnow().date()
+    async with engine.connect() as conn:
+        due = (
+            (
+                await conn.execute(
+                    select(PlanTemplate.id)
+                    .where(
+                        PlanTemplate.recurrence_days.is_not(None),
+                        PlanTemplate.next_run_on <= today,
+                    )
+                    .order_by(PlanTemplate.next_run_on)
+                    .limit(settings.PLAN_RECURRENCE_BATCH_SIZE)
+                )
+            )
+            .scalars()
+            .all()
+        )
+
+    created = 0
+    for template_id in due:
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as db:
+                template = await db.get(PlanTemplate, template_id)
+                # 停機期間錯過的週期不補產生，只產生最近一期並推進到今天之後
+                step = timedelta(days=template.recurrence_days)
+                missed = (today - template.next_run_on) // step
+                exec_date = template.next_run_on + missed * step
+                await instantiate(db, template, exec_date=exec_date)
+                template.next_run_on = exec_date + step
+                await db.commit()
+        except Exception:
+            logger.exception(f"Recurring plan failed for template {template_id}")
+            continue
+        created += 1
+
+    if created:
+        logger.info(f"Materialized {created} recurring plans")
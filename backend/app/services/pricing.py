@@ -0,0 +1,142 @@
+"""
+價格統計：計畫完成時增量更新，建立物品與列表時以主鍵查詢預估價格
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import upsert
+from app.models.plan import ShoppingPlan, PurchaseRecord
+from app.models.pricing import PriceStat
+from app.services.suggestions import normalize_item_name
+
+_CENT = Decimal("0.01")
+
+
+def _scope(group_id: UUID | None, owner_id: UUID) -> tuple[str, UUID]:
+    """群組物品使用群組價格，其餘使用擁有者個人價格"""
+    return ("group", group_id) if group_id else ("user", owner_id)
+
+
+def _update(stat: PriceStat, price: Decimal) -> None:
+    stat.count += 1
+    stat.mean_price += (price - stat.mean_price) / stat.count
+    # 近似中位數：朝新價格方向移動一小步，步長隨樣本數遞減
+    step = max(abs(stat.mean_price) / (stat.count + 1), _CENT)
+    if price > stat.median_price:
+        stat.median_price = min(price, stat.median_price + step)
+    elif price < stat.median_price:
+        stat.median_price = max(price, stat.median_price - step)
+    stat.last_price = price
+
+
+async def record_prices(
+    db: AsyncSession, plan: ShoppingPlan, records: Iterable[PurchaseRecord]
+) -> None:
+    """以本次完成的實際價格更新統計（與 complete_plan 同一交易）
+
+    先以 ON CONFLICT DO NOTHING 補上缺少的列，再 SELECT ... FOR UPDATE 鎖定後
+    依序套用 _update：同一範圍的計畫同時完成時不會因主鍵衝突失敗，
+    也不會讀到同一份舊值而遺失其中一次更新。
+    """
+    scopes = [("user", plan.creator_id)]
+    if plan.group_id:
+        scopes.append(("group", plan.group_id))
+    prices = [
+        (normalize_item_name(r.item_name), Decimal(r.actual_price))
+        for r in records
+        if r.actual_price is not None
+    ]
+    if not prices:
+        return
+
+    now = datetime.utcnow()
+    first_price: dict[str, Decimal] = {}
+    for name_key, price in prices:
+        first_price.setdefault(name_key, price)
+    # count = 0 的種子列，套用第一筆價格後與直接以該價格建立相同
+    await db.execute(
+        upsert(db, PriceStat)
+        .values(
+            [
+                {
+                    "scope_type": scope_type,
+                    "scope_id": scope_id,
+                    "name_key": name_key,
+                    "count": 0,
+                    "mean_price": price,
+                    "median_price": price,
+                    "last_price": price,
+                    "updated_at": now,
+                }
+                for scope_type, scope_id in scopes
+                for name_key, price in first_price.items()
+            ]
+        )
+        .on_conflict_do_nothing()
+    )
+
+    keys = {(t, sid, name) for t, sid in scopes for name in first_price}
+    stats = {
+        (s.scope_type, s.scope_id, s.name_key): s
+        for s in (
+            await db.execute(
+                select(PriceStat)
+                .where(
+                    tuple_(
+                        PriceStat.scope_type, PriceStat.scope_id, PriceStat.name_key
+                    ).in_(keys)
+                )
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            )
+        ).scalars()
+    }
+    for scope_type, scope_id in scopes:
+        for name_key, price in prices:
+            stat = stats[(scope_type, scope_id, name_key)]
+            _update(stat, price)
+            stat.updated_at = now
+
+
+def _estimate(stat: PriceStat) -> Decimal:
+    return Decimal(stat.median_price).quantize(_CENT)
+
+
+async def estimate_price(
+    db: AsyncSession, name: str, group_id: UUID | None, owner_id: UUID
+) -> Decimal | None:
+    scope_type, scope_id = _scope(group_id, owner_id)
+    stat = await db.get(PriceStat, (scope_type, scope_id, normalize_item_name(name)))
+    return _estimate(stat) if stat else None
+
+
+async def estimate_prices(db: AsyncSession, items: Iterable) -> dict[UUID, Decimal]:
+    """批次以主鍵查詢（id, name, group_id, owner_id）物品的預估價格"""
+    keys_by_item = {
+        item.id: (*_scope(item.group_id, item.owner_id), normalize_item_name(item.name))
+        for item in items
+    }
+    if not keys_by_item:
+        return {}
+    stats = {
+        (s.scope_type, s.scope_id, s.name_key): s
+        for s in (
+            await db.execute(
+                select(PriceStat).where(
+                    tuple_(
+                        PriceStat.scope_type, PriceStat.scope_id, PriceStat.name_key
+                    ).in_(set(keys_by_item.values()))
+                )
+            )
+        ).scalars()
+    }
+    return {
+        item_id: _estimate(stats[key])
+        for item_id, key in keys_by_item.items()
+        if key in stats
+    }
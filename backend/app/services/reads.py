@@ -0,0 +1,140 @@
+"""
+Core 讀取路徑：列表以 Core 欄位查詢取得 Row，轉成不可變的 NamedTuple DTO
+
+不建立 ORM 實體、不進 identity map，也不必在實體上掛臨時屬性（is_shared 等）。
+回應 schema 皆為 from_attributes，FastAPI 可直接序列化這些 DTO。
+比較見 benchmarks/list_reads.py。
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, NamedTuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.models.item import Item, ItemCategory, ItemStatus
+from app.models.group import Group, GroupMember, GroupRole
+from app.models.plan import ShoppingPlan, PlanItem, PlanStatus
+
+
+# ── 物品 ─────────────────────────────────────────────────────────────────
+class ItemRow(NamedTuple):
+    id: UUID
+    owner_id: UUID
+    group_id: UUID | None
+    name: str
+    quantity: int
+    est_price: Decimal | None
+    category: ItemCategory
+    status: ItemStatus
+    brand_note: str | None
+    note: str | None
+    created_at: datetime
+    updated_at: datetime
+    version: int
+    archived_at: datetime | None
+    # 以下為計算欄位，不在 ITEM_COLUMNS 中
+    is_shared: bool = False
+    price_estimate: Decimal | None = None
+
+    @classmethod
+    def from_row(cls, row, **computed) -> "ItemRow":
+        """row 以 ITEM_COLUMNS 開頭（之後可接其他欄位）"""
+        return cls(*row[:_N_ITEM_COLUMNS], **computed)
+
+
+ITEM_COLUMNS = tuple(getattr(Item, name) for name in ItemRow._fields[:-2])
+_N_ITEM_COLUMNS = len(ITEM_COLUMNS)
+
+
+# ── 計畫 ─────────────────────────────────────────────────────────────────
+class PlanItemRow(NamedTuple):
+    id: UUID
+    item_id: UUID
+    is_done: bool
+    version: int
+
+
+class PlanRow(NamedTuple):
+    id: UUID
+    name: str
+    creator_id: UUID
+    group_id: UUID | None
+    exec_date: date | None
+    status: PlanStatus
+    created_at: datetime
+    completed_at: datetime | None
+    version: int
+    plan_items: tuple[PlanItemRow, ...] = ()
+    is_shared: bool = False
+
+    @classmethod
+    def from_row(cls, row, **computed) -> "PlanRow":
+        return cls(*row[:_N_PLAN_COLUMNS], **computed)
+
+
+PLAN_COLUMNS = tuple(getattr(ShoppingPlan, name) for name in PlanRow._fields[:-2])
+_N_PLAN_COLUMNS = len(PLAN_COLUMNS)
+
+
+async def fetch_plan_items(
+    db: AsyncSession, plan_ids: Iterable[UUID]
+) -> dict[UUID, tuple[PlanItemRow, ...]]:
+    """單次查詢取得多個計畫的物品"""
+    plan_ids = list(plan_ids)
+    if not plan_ids:
+        return {}
+    grouped: dict[UUID, list[PlanItemRow]] = defaultdict(list)
+    rows = await db.execute(
+        select(PlanItem.plan_id, *(getattr(PlanItem, f) for f in PlanItemRow._fields))
+        .where(PlanItem.plan_id.in_(plan_ids))
+    )
+    for plan_id, *values in rows:
+        grouped[plan_id].append(PlanItemRow(*values))
+    return {plan_id: tuple(items) for plan_id, items in grouped.items()}
+
+
+# ── 群組 ─────────────────────────────────────────────────────────────────
+class GroupMemberRow(NamedTuple):
+    user_id: UUID
+    user_name: str | None
+    role: GroupRole
+    joined_at: datetime
+
+
+class GroupRow(NamedTuple):
+    id: UUID
+    name: str
+    creator_id: UUID
+    created_at: datetime
+    members: tuple[GroupMemberRow, ...] = ()
+
+
+GROUP_COLUMNS = tuple(getattr(Group, name) for name in GroupRow._fields[:-1])
+
+
+async def fetch_group_members(
+    db: AsyncSession, group_ids: Iterable[UUID]
+) -> dict[UUID, tuple[GroupMemberRow, ...]]:
+    """單次 JOIN 取得多個群組的成員與名稱"""
+    group_ids = list(group_ids)
+    if not group_ids:
+        return {}
+    grouped: dict[UUID, list[GroupMemberRow]] = defaultdict(list)
+    rows = await db.execute(
+        select(
+            GroupMember.group_id,
+            GroupMember.user_id,
+            User.name,
+            GroupMember.role,
+            GroupMember.joined_at,
+        )
+        .outerjoin(User, User.id == GroupMember.user_id)
+        .where(GroupMember.group_id.in_(group_ids))
+    )
+    for group_id, *values in rows:
+        grouped[group_id].append(GroupMemberRow(*values))
+    return {group_id: tuple(members) for group_id, members in grouped.items()}
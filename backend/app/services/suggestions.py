@@ -0,0 +1,139 @@
+"""
+回購建議：於計畫完成時增量更新每個範圍（使用者 / 群組）的回購週期
+"""
+import re
+import unicodedata
+from datetime import datetime
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import (
+    Float,
+    Interval,
+    String,
+    and_,
+    case,
+    cast,
+    extract,
+    func,
+    literal_column,
+    or_,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import upsert
+from app.models.group import GroupMember
+from app.models.plan import ShoppingPlan, PurchaseRecord
+from app.models.suggestion import RepurchaseStat
+
+# 新間隔的權重（指數移動平均），越大越快反映習慣改變
+EWMA_ALPHA = 0.3
+# 同一天內重複購買不視為一次回購週期
+MIN_INTERVAL_DAYS = 0.5
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_item_name(name: str) -> str:
+    """全半形統一、去除多餘空白並轉小寫，作為跨計畫比對用的 key"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", name)).strip().lower()
+
+
+def _scopes(plan: ShoppingPlan) -> list[tuple[str, UUID]]:
+    scopes = [("user", plan.creator_id)]
+    if plan.group_id:
+        scopes.append(("group", plan.group_id))
+    return scopes
+
+
+def _days_between(dialect: str, later, earlier):
+    if dialect == "postgresql":
+        return cast(extract("epoch", later - earlier), Float) / 86400
+    return func.julianday(later) - func.julianday(earlier)
+
+
+def _add_days(dialect: str, at, days):
+    if dialect == "postgresql":
+        return at + days * literal_column("INTERVAL '1 day'", Interval)
+    # days 為 NULL 時修飾字串亦為 NULL，結果為 NULL
+    return func.datetime(at, cast(days * 86400, String) + " seconds")
+
+
+async def record_purchases(
+    db: AsyncSession, plan: ShoppingPlan, records: Iterable[PurchaseRecord]
+) -> None:
+    """以本次完成的購買紀錄更新回購統計（與 complete_plan 同一交易）
+
+    單一 INSERT ... ON CONFLICT DO UPDATE，EWMA 於資料庫端以目前列值計算：
+    同一範圍的兩個計畫同時完成時不會因主鍵衝突失敗，也不會互相覆蓋統計。
+    """
+    latest: dict[str, PurchaseRecord] = {}
+    for r in records:
+        latest[normalize_item_name(r.item_name)] = r
+    if not latest:
+        return
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "scope_type": scope_type,
+            "scope_id": scope_id,
+            "name_key": name_key,
+            "display_name": r.item_name,
+            "category": r.category,
+            "last_quantity": r.quantity,
+            "purchase_count": 1,
+            "last_purchased_at": r.purchased_at or now,
+        }
+        for scope_type, scope_id in _scopes(plan)
+        for name_key, r in latest.items()
+    ]
+
+    dialect = db.get_bind().dialect.name
+    stmt = upsert(db, RepurchaseStat).values(rows)
+    new = stmt.excluded
+    # SET 子句中的欄位參照皆為更新前的值
+    interval = _days_between(
+        dialect, new.last_purchased_at, RepurchaseStat.last_purchased_at
+    )
+    avg_interval = case(
+        (interval < MIN_INTERVAL_DAYS, RepurchaseStat.avg_interval_days),
+        (RepurchaseStat.avg_interval_days.is_(None), interval),
+        else_=EWMA_ALPHA * interval
+        + (1 - EWMA_ALPHA) * RepurchaseStat.avg_interval_days,
+    )
+    last_purchased_at = case(
+        (
+            new.last_purchased_at > RepurchaseStat.last_purchased_at,
+            new.last_purchased_at,
+        ),
+        else_=RepurchaseStat.last_purchased_at,
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["scope_type", "scope_id", "name_key"],
+            set_={
+                "display_name": new.display_name,
+                "category": new.category,
+                "last_quantity": new.last_quantity,
+                "purchase_count": RepurchaseStat.purchase_count + 1,
+                "avg_interval_days": avg_interval,
+                "last_purchased_at": last_purchased_at,
+                "next_due_at": _add_days(dialect, last_purchased_at, avg_interval),
+            },
+        )
+    )
+
+
+def visible_stats_filter(user_id: UUID):
+    """我自己的 + 我所屬群組的回購統計"""
+    return or_(
+        and_(RepurchaseStat.scope_type == "user", RepurchaseStat.scope_id == user_id),
+        and_(
+            RepurchaseStat.scope_type == "group",
+            RepurchaseStat.scope_id.in_(
+                select(GroupMember.group_id).where(GroupMember.user_id == user_id)
+            ),
+        ),
+    )
@@ -0,0 +1,195 @@
+"""
+可見性展開表維護（VISIBILITY_FANOUT_ENABLED）
+
+物品：owner（edit）、ItemShare（依分享權限）、群組成員（edit）
+計畫：creator（edit）、PlanShare（依分享權限）
+
+異動共享、群組成員或擁有者時，於同一交易呼叫 sync_items / sync_plans，
+以 INSERT ... SELECT 重新展開受影響的列。刪除物品/計畫/使用者由外鍵 CASCADE 處理。
+
+    python -m app.services.visibility check     # 比對展開表與來源資料
+    python -m app.services.visibility rebuild   # 全部重建
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from sqlalchemy import (
+    String,
+    cast,
+    delete,
+    except_,
+    func,
+    insert,
+    literal,
+    select,
+    true,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.models.item import Item, ItemShare
+from app.models.group import GroupMember
+from app.models.plan import ShoppingPlan, PlanShare
+from app.models.visibility import UserVisibleItem, UserVisiblePlan
+from app.services.maintenance import maintenance_job
+
+logger = logging.getLogger(__name__)
+
+_ITEM_COLUMNS = ["user_id", "item_id", "reason", "permission"]
+_PLAN_COLUMNS = ["user_id", "plan_id", "reason", "permission"]
+
+
+def _item_rows(condition):
+    """condition（對 Item 的篩選）範圍內應存在的 (user_id, item_id, reason, permission)"""
+    owner = select(
+        Item.owner_id, Item.id, literal("owner", String), literal("edit", String)
+    ).where(condition)
+    share = (
+        select(
+            ItemShare.shared_with,
+            ItemShare.item_id,
+            literal("share", String),
+            cast(ItemShare.permission, String),
+        )
+        .join(Item, Item.id == ItemShare.item_id)
+        .where(condition)
+    )
+    group = (
+        select(
+            GroupMember.user_id,
+            Item.id,
+            literal("group", String),
+            literal("edit", String),
+        )
+        .join(Item, Item.group_id == GroupMember.group_id)
+        .where(condition)
+    )
+    return owner.union_all(share, group)
+
+
+def _plan_rows(condition):
+    creator = select(
+        ShoppingPlan.creator_id,
+        ShoppingPlan.id,
+        literal("creator", String),
+        literal("edit", String),
+    ).where(condition)
+    share = (
+        select(
+            PlanShare.shared_with,
+            PlanShare.plan_id,
+            literal("share", String),
+            cast(PlanShare.permission, String),
+        )
+        .join(ShoppingPlan, ShoppingPlan.id == PlanShare.plan_id)
+        .where(condition)
+    )
+    return creator.union_all(share)
+
+
+async def sync_items(db: AsyncSession, condition) -> None:
+    """重新展開符合 condition 的物品（於呼叫端交易中）"""
+    if not settings.VISIBILITY_FANOUT_ENABLED:
+        return
+    await db.flush()
+    await db.execute(
+        delete(UserVisibleItem)
+        .where(UserVisibleItem.item_id.in_(select(Item.id).where(condition)))
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        insert(UserVisibleItem).from_select(_ITEM_COLUMNS, _item_rows(condition))
+    )
+
+
+async def sync_plans(db: AsyncSession, condition) -> None:
+    """重新展開符合 condition 的計畫（於呼叫端交易中）"""
+    if not settings.VISIBILITY_FANOUT_ENABLED:
+        return
+    await db.flush()
+    await db.execute(
+        delete(UserVisiblePlan)
+        .where(UserVisiblePlan.plan_id.in_(select(ShoppingPlan.id).where(condition)))
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        insert(UserVisiblePlan).from_select(_PLAN_COLUMNS, _plan_rows(condition))
+    )
+
+
+# ── 一致性檢查 / 重建 ────────────────────────────────────────────────────
+_TABLES = (
+    (UserVisibleItem, _ITEM_COLUMNS, _item_rows),
+    (UserVisiblePlan, _PLAN_COLUMNS, _plan_rows),
+)
+
+
+async def check_consistency(engine: AsyncEngine) -> dict[str, tuple[int, int]]:
+    """回傳 {表名: (缺少列數, 多餘列數)}"""
+    report = {}
+    async with engine.connect() as conn:
+        for model, columns, rows in _TABLES:
+            expected = rows(true())
+            actual = select(*(getattr(model, c) for c in columns))
+            missing = (
+                await conn.execute(
+                    select(func.count()).select_from(
+                        except_(expected, actual).subquery()
+                    )
+                )
+            ).scalar_one()
+            extra = (
+                await conn.execute(
+                    select(func.count()).select_from(
+                        except_(actual, expected).subquery()
+                    )
+                )
+            ).scalar_one()
+            report[model.__tablename__] = (missing, extra)
+    return report
+
+
+async def rebuild(engine: AsyncEngine) -> None:
+    """清空並由來源資料重新展開（單一交易，期間讀取仍看得到舊資料）"""
+    async with engine.begin() as conn:
+        for model, columns, rows in _TABLES:
+            await conn.execute(delete(model))
+            await conn.execute(insert(model).from_select(columns, rows(true())))
+    logger.info("Visibility tables rebuilt")
+
+
+@maintenance_job("check_visibility", settings.VISIBILITY_CHECK_INTERVAL_SECONDS)
+async def check_visibility(engine: AsyncEngine) -> None:
+    if not settings.VISIBILITY_FANOUT_ENABLED:
+        return
+    if settings.VISIBILITY_CHECK_INTERVAL_SECONDS <= 0:
+        return
+    for table, (missing, extra) in (await check_consistency(engine)).items():
+        if missing or extra:
+            logger.warning(
+                f"Visibility table {table} inconsistent: "
+                f"{missing} missing, {extra} extra; run rebuild"
+            )
+
+
+async def _main(command: str) -> int:
+    from app.core.database import engine, dispose_engine
+
+    try:
+        if command == "rebuild":
+            await rebuild(engine)
+            return 0
+        report = await check_consistency(engine)
+        for table, (missing, extra) in report.items():
+            print(f"{table}: missing={missing} extra={extra}")
+        return 0 if not any(m or e for m, e in report.values()) else 1
+    finally:
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="可見性展開表檢查 / 重建")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    sys.exit(asyncio.run(_main(parser.parse_args().command)))
@@ -0,0 +1,136 @@
+"""
+啟動時間量測：記錄每個模組的匯入耗時與各啟動階段，產生冷啟動報告
+
+啟用方式：環境變數 STARTUP_REPORT=1（需在匯入 app 之前判斷，故不經 Settings）
+本模組刻意放在 app/ 而非 app/core/，避免觸發 app.core 的大量匯入。
+"""
+import importlib.abc
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+_T0 = time.perf_counter()
+
+
+def enabled() -> bool:
+    return os.getenv("STARTUP_REPORT", "").lower() in ("1", "true", "yes")
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader, name: str, timings: dict[str, float]):
+        self._loader = loader
+        self._name = name
+        self._timings = timings
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timings[self._name] = time.perf_counter() - start
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """包裝其他 finder 回傳的 loader，量測 exec_module（含子匯入）時間"""
+
+    def __init__(self):
+        self.timings: dict[str, float] = {}
+        self._busy = False
+
+    def find_spec(self, fullname, path, target=None):
+        if self._busy:
+            return None
+        self._busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._busy = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, fullname, self.timings)
+        return spec
+
+
+class StartupTimer:
+    def __init__(self):
+        self.phases: list[tuple[str, float]] = []
+        self._imports: _ImportTimer | None = None
+        self._last_mark = _T0
+        self.ready_at: float | None = None
+
+    def install_import_hook(self) -> None:
+        if self._imports is None:
+            self._imports = _ImportTimer()
+            sys.meta_path.insert(0, self._imports)
+
+    def remove_import_hook(self) -> None:
+        if self._imports in sys.meta_path:
+            sys.meta_path.remove(self._imports)
+
+    def mark(self, name: str) -> None:
+        """記錄自上一個 mark（或程序啟動）以來的耗時"""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last_mark))
+        self._last_mark = now
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def mark_ready(self) -> None:
+        self.ready_at = time.perf_counter() - _T0
+        self.remove_import_hook()
+
+    def report(self, top: int = 25) -> dict:
+        imports = self._imports.timings if self._imports else {}
+        # 以頂層套件彙總（只計頂層模組本身，其耗時已包含子模組）
+        packages = {
+            name: sec for name, sec in imports.items() if "." not in name
+        }
+        return {
+            "ready_seconds": round(self.ready_at, 4) if self.ready_at else None,
+            "phases": {name: round(sec, 4) for name, sec in self.phases},
+            "top_packages": dict(
+                sorted(
+                    ((n, round(s, 4)) for n, s in packages.items()),
+                    key=lambda kv: kv[1],
+                    reverse=True,
+                )[:top]
+            ),
+            "app_modules": {
+                n: round(s, 4)
+                for n, s in sorted(imports.items())
+                if n == "app" or n.startswith("app.")
+            },
+        }
+
+    def log_report(self) -> None:
+        report = self.report()
+        logger.info(f"Startup ready in {report['ready_seconds']}s")
+        for name, sec in report["phases"].items():
+            logger.info(f"  phase {name}: {sec}s")
+        for name, sec in report["top_packages"].items():
+            logger.info(f"  import {name}: {sec}s")
+
+
+startup_timer = StartupTimer()
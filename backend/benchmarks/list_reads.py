@@ -0,0 +1,118 @@
+"""
+列表讀取比較：ORM 實體 vs Core 欄位查詢 + NamedTuple DTO
+
+    cd backend && python -m benchmarks.list_reads --rows 50000 --repeat 5
+
+於記憶體 SQLite 建立 N 筆物品，兩種方式各自查詢並以 ItemOut 序列化，
+輸出每輪最佳耗時、每秒列數與 tracemalloc 峰值記憶體。
+"""
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+# 一律使用記憶體資料庫，避免寫入正式資料庫
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.core.database import (  # noqa: E402
+    AsyncSessionLocal,
+    create_schema,
+    dispose_engine,
+)
+from app.models.item import Item, ItemCategory, ItemStatus  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas import ItemOut  # noqa: E402
+from app.services.reads import ITEM_COLUMNS, ItemRow  # noqa: E402
+
+_items_adapter = TypeAdapter(list[ItemOut])
+
+
+async def _seed(n: int) -> uuid.UUID:
+    owner_id = uuid.uuid4()
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            insert(User).values(
+                id=owner_id, email="bench@example.com", hashed_pw="x", name="bench"
+            )
+        )
+        await db.execute(
+            insert(Item),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "owner_id": owner_id,
+                    "name": f"item {i}",
+                    "quantity": 1 + i % 5,
+                    "est_price": None,
+                    "category": ItemCategory.essential,
+                    "status": ItemStatus.pending,
+                    "note": "benchmark row",
+                    "created_at": now,
+                    "updated_at": now,
+                    "version": 1,
+                }
+                for i in range(n)
+            ],
+        )
+        await db.commit()
+    return owner_id
+
+
+async def orm_path(owner_id: uuid.UUID) -> int:
+    async with AsyncSessionLocal() as db:
+        items = (
+            (await db.execute(select(Item).where(Item.owner_id == owner_id)))
+            .scalars()
+            .all()
+        )
+        for item in items:
+            item.is_shared = False
+            item.price_estimate = None
+        return len(_items_adapter.validate_python(items, from_attributes=True))
+
+
+async def core_path(owner_id: uuid.UUID) -> int:
+    async with AsyncSessionLocal() as db:
+        rows = (
+            await db.execute(select(*ITEM_COLUMNS).where(Item.owner_id == owner_id))
+        ).all()
+        items = [ItemRow.from_row(row) for row in rows]
+        return len(_items_adapter.validate_python(items, from_attributes=True))
+
+
+async def _measure(func, owner_id, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func(owner_id)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    await func(owner_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+async def main(rows: int, repeat: int) -> None:
+    await create_schema()
+    owner_id = await _seed(rows)
+    print(f"{'path':<6} {'best s':>9} {'rows/s':>12} {'peak MiB':>10}")
+    for name, func in (("orm", orm_path), ("core", core_path)):
+        best, peak = await _measure(func, owner_id, repeat)
+        print(f"{name:<6} {best:>9.3f} {rows / best:>12,.0f} {peak / 2**20:>10.1f}")
+    await dispose_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -0,0 +1,89 @@
+"""
+正式環境啟動設定：gunicorn 管理多個 UvicornWorker
+
+    gunicorn main:app -c gunicorn.conf.py
+
+- worker 數量預設依可用 CPU 數（WEB_CONCURRENCY 可覆寫）
+- 資料表建立只在 master 執行一次，worker 不再各自 create_all
+- fork 後捨棄繼承的連線池，每個 worker 使用自己的連線
+- 收到 SIGTERM 時等待進行中的請求完成（GRACEFUL_TIMEOUT_SECONDS）
+- 處理 WORKER_MAX_REQUESTS 個請求或 RSS 超過 WORKER_MAX_MEMORY_MB 後自動換新 worker
+"""
+import asyncio
+import os
+import signal
+import threading
+import time
+
+from app.core.config import settings
+
+
+def _available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = f"{settings.APP_HOST}:{settings.APP_PORT}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = settings.WEB_CONCURRENCY or _available_cpus()
+max_requests = settings.WORKER_MAX_REQUESTS
+max_requests_jitter = settings.WORKER_MAX_REQUESTS_JITTER
+graceful_timeout = settings.GRACEFUL_TIMEOUT_SECONDS
+timeout = 60
+keepalive = 5
+preload_app = False
+
+
+def on_starting(server):
+    """master：fork 前建立資料表一次，之後的 worker 略過 create_all"""
+    if not settings.DB_CREATE_ALL or settings.FAST_START:
+        return
+    from app.core.database import create_schema, dispose_engine
+
+    async def _run():
+        await create_schema()
+        await dispose_engine()
+
+    asyncio.run(_run())
+    settings.DB_CREATE_ALL = False  # fork 出的 worker 繼承此設定
+    server.log.info("Database schema ensured")
+
+
+def post_fork(server, worker):
+    """worker：捨棄自 master 繼承的連線池（不關閉 master 的連線）"""
+    import sys
+
+    database = sys.modules.get("app.core.database")
+    if database is not None:
+        database.engine.sync_engine.dispose(close=False)
+
+    limit_mb = settings.WORKER_MAX_MEMORY_MB
+    if limit_mb > 0:
+        threading.Thread(
+            target=_memory_watchdog, args=(worker, limit_mb), daemon=True
+        ).start()
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _memory_watchdog(worker, limit_mb: int) -> None:
+    """RSS 超過上限時對自己送 SIGTERM：停止接收新連線、處理完進行中請求後退出，
+    由 gunicorn master 補上新的 worker"""
+    while True:
+        time.sleep(10)
+        try:
+            rss = _rss_mb()
+        except OSError:
+            return  # 非 Linux，停用
+        if rss > limit_mb:
+            worker.log.warning(
+                f"Worker {worker.pid} RSS {rss:.0f}MB > {limit_mb}MB, recycling"
+            )
+            os.kill(worker.pid, signal.SIGTERM)
+            return
@@ -1,15 +1,33 @@
+from app.startup import startup_timer, enabled as startup_report_enabled
+
+if startup_report_enabled():
+    startup_timer.install_import_hook()
+
 import logging
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.security import warm_up as warm_up_security
+from app.core.database import engine, create_schema, dispose_engine
+from app.core.idempotency import IdempotencyMiddleware
+from app.core import slow_queries
+from app.core.deps import require_diagnostics_token
+from app.core.pool_health import PoolHealthChecker
+from app.core.profiling import ProfilerMiddleware, is_enabled as profiling_enabled
+from app.core.invalidation import bus as invalidation_bus
+from app.services.maintenance import MaintenanceScheduler
 from app.routers import (
     auth_router,
     friends_router,
     items_router,
     groups_router,
     plans_router,
+    plan_templates_router,
+    records_router,
+    suggestions_router,
+    sync_router,
 )
 
 # ── Logging ───────────────────────────────────────────────────────────────
@@ -25,6 +43,13 @@ app = FastAPI(
     openapi_url="/api/openapi.json",
 )
 
+# ── Idempotency-Key（置於 CORS 內層，回放的回應仍帶 CORS 標頭）────────
+app.add_middleware(IdempotencyMiddleware)
+
+# ── 慢查詢的來源路由 ──────────────────────────────────────────────────
+if slow_queries.is_enabled():
+    app.add_middleware(slow_queries.QueryContextMiddleware)
+
 # ── CORS ──────────────────────────────────────────────────────────────────
 app.add_middleware(
     CORSMiddleware,
@@ -32,8 +57,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Profile-Id"],
 )
 
+# ── 效能分析（最外層，涵蓋其他 middleware；未啟用時不安裝）────────────
+if profiling_enabled():
+    app.add_middleware(ProfilerMiddleware)
+
 # ── 路由 ──────────────────────────────────────────────────────────────────
 API_PREFIX = "/api/v1"
 app.include_router(auth_router, prefix=API_PREFIX)
@@ -41,14 +71,63 @@ app.include_router(friends_router, prefix=API_PREFIX)
 app.include_router(items_router, prefix=API_PREFIX)
 app.include_router(groups_router, prefix=API_PREFIX)
 app.include_router(plans_router, prefix=API_PREFIX)
+app.include_router(plan_templates_router, prefix=API_PREFIX)
+app.include_router(records_router, prefix=API_PREFIX)
+app.include_router(suggestions_router, prefix=API_PREFIX)
+app.include_router(sync_router, prefix=API_PREFIX)
+
+
+maintenance = MaintenanceScheduler(engine)
+pool_health = PoolHealthChecker(engine)
+
+
+startup_timer.mark("import & app setup")
 
 
 @app.on_event("startup")
 async def on_startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # FAST_START：略過 DDL 與延遲匯入的預載，盡快開始服務
+    if settings.DB_CREATE_ALL and not settings.FAST_START:
+        with startup_timer.phase("create_schema"):
+            await create_schema()
+    if not settings.FAST_START:
+        with startup_timer.phase("warm_up_security"):
+            warm_up_security()
+    with startup_timer.phase("pool_health"):
+        await pool_health.check()  # 先完成一次檢查，/health 立即反映真實狀態
+    pool_health.start()
+    invalidation_bus.start()
+    if settings.MAINTENANCE_ENABLED:
+        maintenance.start()
+    startup_timer.mark_ready()
+    if startup_report_enabled():
+        startup_timer.log_report()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await maintenance.stop()
+    await invalidation_bus.stop()
+    await pool_health.stop()
+    await dispose_engine()
 
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    """readiness：依背景檢查快取的連線池狀態回應，不在此查詢資料庫"""
+    return JSONResponse(
+        pool_health.report(), status_code=200 if pool_health.is_ready() else 503
+    )
+
+
+@app.get("/health/startup")
+async def startup_report():
+    return startup_timer.report()
+
+
+@app.get(
+    "/health/slow-queries", dependencies=[Depends(require_diagnostics_token)]
+)
+async def slow_query_report(top: int = 20):
+    """本 worker 的慢查詢指紋彙總；EXPLAIN ANALYZE 的執行計畫會帶出參數值"""
+    return slow_queries.report(top)
@@ -0,0 +1,20 @@
+"""
+測試一律使用記憶體 SQLite（需於匯入 app 之前設定）
+
+    cd backend && pip install -r requirements-dev.txt && python -m pytest -q
+"""
+import os
+
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["MAINTENANCE_ENABLED"] = "false"
+# 限流另有專門測試時再以 monkeypatch 開啟；每個測試使用全新的 bucket
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import pytest  # noqa: E402
+
+from app.core import ratelimit  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _fresh_rate_limit_backend(monkeypatch):
+    monkeypatch.setattr(ratelimit, "_backend", None)
@@ -0,0 +1,427 @@
+"""
+SQLite smoke test：註冊 → 登入 → 帶 Bearer token 建立與列出物品
+"""
+import asyncio
+import json
+import uuid
+from collections import defaultdict
+from datetime import date, datetime
+
+import httpx
+import pytest
+from sqlalchemy import insert, select, update
+
+from app.core.config import settings
+from app.core.database import (
+    AsyncSessionLocal,
+    create_schema,
+    dispose_engine,
+    engine,
+)
+from app.core.invalidation import InvalidationKind, bus, publish
+from app.core.security import create_access_token
+from app.models.idempotency import IdempotencyKey
+from app.models.item import Item
+from app.models.plan import PurchaseRecordArchive
+from app.models.suggestion import RepurchaseStat
+from main import app
+
+
+def _run(scenario):
+    async def _main():
+        await create_schema()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test/api/v1"
+        ) as client:
+            await scenario(client)
+        await dispose_engine()  # 記憶體資料庫隨連線關閉而清空
+
+    asyncio.run(_main())
+
+
+async def _login(client: httpx.AsyncClient, email: str) -> dict:
+    password = "password123"
+    resp = await client.post(
+        "/auth/register", json={"email": email, "password": password, "name": "t"}
+    )
+    assert resp.status_code == 201, resp.text
+    resp = await client.post("/auth/login", json={"email": email, "password": password})
+    assert resp.status_code == 200, resp.text
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_authenticated_item_roundtrip():
+    async def scenario(client):
+        headers = await _login(client, "smoke@example.com")
+
+        resp = await client.get("/auth/me", headers=headers)
+        assert resp.status_code == 200, resp.text
+
+        resp = await client.post("/items", json={"name": "牛奶"}, headers=headers)
+        assert resp.status_code == 201, resp.text
+        item_id = resp.json()["id"]
+
+        resp = await client.get("/items", headers=headers)
+        assert resp.status_code == 200, resp.text
+        assert [item["id"] for item in resp.json()] == [item_id]
+
+    _run(scenario)
+
+
+def test_malformed_subject_is_unauthorized():
+    async def scenario(client):
+        token = create_access_token("not-a-uuid")
+        resp = await client.get(
+            "/auth/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert resp.status_code == 401, resp.text
+
+    _run(scenario)
+
+
+def test_created_item_is_listed_with_visibility_fanout(monkeypatch):
+    monkeypatch.setattr(settings, "VISIBILITY_FANOUT_ENABLED", True)
+
+    async def scenario(client):
+        headers = await _login(client, "fanout@example.com")
+        resp = await client.post("/items", json={"name": "雞蛋"}, headers=headers)
+        assert resp.status_code == 201, resp.text
+        item_id = resp.json()["id"]
+
+        resp = await client.get("/items", headers=headers)
+        assert resp.status_code == 200, resp.text
+        assert [item["id"] for item in resp.json()] == [item_id]
+
+    _run(scenario)
+
+
+def test_group_items_keyset_pages_through_equal_timestamps():
+    async def scenario(client):
+        headers = await _login(client, "paging@example.com")
+        resp = await client.post("/groups", json={"name": "家"}, headers=headers)
+        assert resp.status_code == 201, resp.text
+        group_id = resp.json()["id"]
+        for name in ("a", "b", "c"):
+            resp = await client.post(
+                "/items", json={"name": name, "group_id": group_id}, headers=headers
+            )
+            assert resp.status_code == 201, resp.text
+        # 模擬批次匯入：所有物品同一個 created_at
+        async with engine.begin() as conn:
+            await conn.execute(update(Item).values(created_at=datetime(2024, 1, 1)))
+
+        seen, params = [], {"limit": 2}
+        while True:
+            resp = await client.get(
+                f"/groups/{group_id}/items", params=params, headers=headers
+            )
+            assert resp.status_code == 200, resp.text
+            page = resp.json()
+            seen += [item["id"] for item in page]
+            if len(page) < params["limit"]:
+                break
+            params.update(before=page[-1]["created_at"], before_id=page[-1]["id"])
+        assert len(seen) == len(set(seen)) == 3
+
+        resp = await client.get(
+            f"/groups/{group_id}/items",
+            params={"before": "2024-01-01T00:00:00"},
+            headers=headers,
+        )
+        assert resp.status_code == 422, resp.text
+
+    _run(scenario)
+
+
+def test_slow_query_report_requires_diagnostics_token(monkeypatch):
+    async def scenario(client):
+        resp = await client.get("http://test/health/slow-queries")
+        assert resp.status_code == 404, resp.text
+
+        monkeypatch.setattr(settings, "DIAGNOSTICS_TOKEN", "secret")
+        resp = await client.get("http://test/health/slow-queries")
+        assert resp.status_code == 403, resp.text
+        resp = await client.get(
+            "http://test/health/slow-queries",
+            headers={"X-Diagnostics-Token": "secret"},
+        )
+        assert resp.status_code == 200, resp.text
+
+    _run(scenario)
+
+
+def test_completing_plans_upserts_repurchase_stats():
+    async def scenario(client):
+        headers = await _login(client, "repurchase@example.com")
+        for _ in range(2):
+            resp = await client.post("/items", json={"name": "牛奶"}, headers=headers)
+            assert resp.status_code == 201, resp.text
+            resp = await client.post(
+                "/plans",
+                json={"name": "採買", "item_ids": [resp.json()["id"]]},
+                headers=headers,
+            )
+            assert resp.status_code == 201, resp.text
+            resp = await client.post(
+                f"/plans/{resp.json()['id']}/complete", headers=headers
+            )
+            assert resp.status_code == 200, resp.text
+
+        async with engine.connect() as conn:
+            stats = (await conn.execute(select(RepurchaseStat))).all()
+        assert [(s.name_key, s.purchase_count) for s in stats] == [("牛奶", 2)]
+
+    _run(scenario)
+
+
+def test_suggestions_reuse_items_matched_by_normalized_name():
+    async def scenario(client):
+        headers = await _login(client, "normalize@example.com")
+        resp = await client.post(
+            "/items", json={"name": "Ｍｉｌｋ  Tea"}, headers=headers
+        )
+        assert resp.status_code == 201, resp.text
+        item_id = resp.json()["id"]
+        resp = await client.post(
+            "/plans", json={"name": "採買", "item_ids": [item_id]}, headers=headers
+        )
+        resp = await client.post(
+            f"/plans/{resp.json()['id']}/complete", headers=headers
+        )
+        assert resp.status_code == 200, resp.text
+
+        resp = await client.post("/plans", json={"name": "下次"}, headers=headers)
+        assert resp.status_code == 201, resp.text
+        resp = await client.post(
+            f"/plans/{resp.json()['id']}/suggestions",
+            json={"name_keys": ["milk tea"]},
+            headers=headers,
+        )
+        assert resp.status_code == 200, resp.text
+        assert [pi["item_id"] for pi in resp.json()["plan_items"]] == [item_id]
+
+    _run(scenario)
+
+
+def test_expired_idempotency_key_is_reused():
+    async def scenario(client):
+        headers = await _login(client, "idempotency@example.com")
+        user_id = (await client.get("/auth/me", headers=headers)).json()["id"]
+        past = datetime(2024, 1, 1)
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(IdempotencyKey).values(
+                    key=f"{user_id}:k1",
+                    fingerprint="0" * 64,
+                    status_code=201,
+                    content_type="application/json",
+                    response_body=b"{}",
+                    created_at=past,
+                    expires_at=past,
+                )
+            )
+
+        headers["Idempotency-Key"] = "k1"
+        resp = await client.post("/items", json={"name": "米"}, headers=headers)
+        assert resp.status_code == 201, resp.text
+        assert "idempotent-replayed" not in resp.headers
+        assert resp.json()["name"] == "米"
+
+        resp = await client.post("/items", json={"name": "米"}, headers=headers)
+        assert resp.headers.get("idempotent-replayed") == "true"
+
+    _run(scenario)
+
+
+def test_toggle_plan_item_etag_round_trips_as_if_match():
+    async def scenario(client):
+        headers = await _login(client, "etag@example.com")
+        resp = await client.post("/items", json={"name": "麵包"}, headers=headers)
+        resp = await client.post(
+            "/plans",
+            json={"name": "採買", "item_ids": [resp.json()["id"]]},
+            headers=headers,
+        )
+        plan = resp.json()
+        url = f"/plans/{plan['id']}/items/{plan['plan_items'][0]['id']}"
+
+        resp = await client.get(f"/plans/{plan['id']}", headers=headers)
+        etag = resp.headers["etag"]
+        for is_done in (True, False):
+            resp = await client.patch(
+                url, json={"is_done": is_done}, headers={**headers, "If-Match": etag}
+            )
+            assert resp.status_code == 200, resp.text
+            assert resp.headers["etag"] == f'"{resp.json()["version"]}"'
+            assert resp.headers["etag"] != etag
+            etag = resp.headers["etag"]
+
+        resp = await client.patch(
+            url, json={"is_done": True}, headers={**headers, "If-Match": '"1"'}
+        )
+        assert resp.status_code == 412, resp.text
+
+    _run(scenario)
+
+
+def test_import_rejects_non_utf8_with_row_number():
+    async def scenario(client):
+        headers = await _login(client, "import@example.com")
+        content = "name,quantity\n牛奶,2\n".encode() + b"\xff\xfe,1\n"
+        resp = await client.post(
+            "/items/import",
+            files={"file": ("items.csv", content, "text/csv")},
+            headers=headers,
+        )
+        assert resp.status_code == 400, resp.text
+        assert "第 3 列" in resp.json()["detail"]
+
+        resp = await client.get("/items", headers=headers)
+        assert resp.json() == []
+
+    _run(scenario)
+
+
+def test_register_is_rate_limited_per_ip(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+
+    async def scenario(client):
+        statuses = []
+        for i in range(6):
+            resp = await client.post(
+                "/auth/register",
+                json={
+                    "email": f"limit{i}@example.com",
+                    "password": "password123",
+                    "name": "t",
+                },
+            )
+            statuses.append(resp.status_code)
+        assert statuses == [201] * 5 + [429]
+
+    _run(scenario)
+
+
+@pytest.mark.parametrize("fanout", [False, True])
+def test_group_member_can_read_group_item(monkeypatch, fanout):
+    monkeypatch.setattr(settings, "VISIBILITY_FANOUT_ENABLED", fanout)
+
+    async def scenario(client):
+        owner = await _login(client, "owner@example.com")
+        member = await _login(client, "member@example.com")
+        outsider = await _login(client, "outsider@example.com")
+        member_id = (await client.get("/auth/me", headers=member)).json()["id"]
+
+        resp = await client.post("/groups", json={"name": "家"}, headers=owner)
+        group_id = resp.json()["id"]
+        resp = await client.post(
+            f"/groups/{group_id}/members", json={"user_id": member_id}, headers=owner
+        )
+        assert resp.status_code == 201, resp.text
+        resp = await client.post(
+            "/items", json={"name": "衛生紙", "group_id": group_id}, headers=owner
+        )
+        item_id = resp.json()["id"]
+
+        resp = await client.get(f"/items/{item_id}", headers=member)
+        assert resp.status_code == 200, resp.text
+        assert resp.json()["is_shared"] is False
+        resp = await client.get(f"/items/{item_id}", headers=outsider)
+        assert resp.status_code == 403, resp.text
+
+    _run(scenario)
+
+
+def test_rolled_back_invalidation_is_not_dispatched(monkeypatch):
+    monkeypatch.setattr(bus, "_handlers", defaultdict(list))
+    received = []
+    bus.register(InvalidationKind.user, received.append)
+
+    async def scenario(client):
+        async with AsyncSessionLocal() as db:
+            await publish(db, InvalidationKind.user, "rolled-back")
+            await db.rollback()
+            await publish(db, InvalidationKind.user, "committed")
+            await db.commit()
+        await asyncio.sleep(0)
+        assert [msg.id for msg in received] == ["committed"]
+
+    _run(scenario)
+
+
+def test_export_merges_archived_records_like_live_ones():
+    async def scenario(client):
+        headers = await _login(client, "export@example.com")
+        resp = await client.post(
+            "/items", json={"name": "咖啡", "est_price": "12.5"}, headers=headers
+        )
+        resp = await client.post(
+            "/plans",
+            json={"name": "採買", "item_ids": [resp.json()["id"]]},
+            headers=headers,
+        )
+        plan_id = resp.json()["id"]
+        resp = await client.post(f"/plans/{plan_id}/complete", headers=headers)
+        assert resp.status_code == 200, resp.text
+
+        def record(day: int, price):
+            return {
+                "id": str(uuid.uuid4()),
+                "plan_id": plan_id,
+                "item_name": f"舊{day}",
+                "quantity": 1,
+                "actual_price": price,
+                "category": "essential",
+                "note": None,
+                "purchased_at": f"2024-01-{day:02d}T10:00:00",
+            }
+
+        async with engine.begin() as conn:
+            # 同月兩列（每計畫每月一列），各自由舊到新
+            for records in ([record(2, 3.5), record(9, 1)], [record(5, None)]):
+                await conn.execute(
+                    insert(PurchaseRecordArchive).values(
+                        plan_id=uuid.UUID(plan_id),
+                        month=date(2024, 1, 1),
+                        record_count=len(records),
+                        records=records,
+                    )
+                )
+
+        resp = await client.get(
+            "/records/export",
+            params={"format": "ndjson", "date_from": "2024-01-03T00:00:00+08:00"},
+            headers=headers,
+        )
+        assert resp.status_code == 200, resp.text
+        rows = [json.loads(line) for line in resp.text.splitlines()]
+        assert [(r["item_name"], r["actual_price"]) for r in rows] == [
+            ("咖啡", "12.50"),
+            ("舊9", "1.00"),
+            ("舊5", None),
+        ]
+
+    _run(scenario)
+
+
+def test_idempotent_replay_keeps_response_headers():
+    async def scenario(client):
+        headers = await _login(client, "replay@example.com")
+        headers["Idempotency-Key"] = "create-1"
+        first = await client.post("/items", json={"name": "鹽"}, headers=headers)
+        assert first.status_code == 201, first.text
+        replay = await client.post("/items", json={"name": "鹽"}, headers=headers)
+        assert replay.headers.get("idempotent-replayed") == "true"
+        assert replay.headers["etag"] == first.headers["etag"]
+        assert replay.json() == first.json()
+
+        del headers["Idempotency-Key"]
+        resp = await client.patch(
+            f"/items/{replay.json()['id']}",
+            json={"quantity": 2},
+            headers={**headers, "If-Match": replay.headers["etag"]},
+        )
+        assert resp.status_code == 200, resp.text
+
+    _run(scenario)
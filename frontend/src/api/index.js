@@ -13,11 +13,13 @@ export const friendsApi = {
   invite: (data) => api.post("/friends/invite", data),
   listInvitations: () => api.get("/friends/invitations"),
   remove: (friendId) => api.delete(`/friends/${friendId}`),
+  suggestions: (params) => api.get("/friends/suggestions", { params }),
 };
 
 export const itemsApi = {
-  list: () => api.get("/items"),
+  list: (params) => api.get("/items", { params }),
   create: (data) => api.post("/items", data),
+  import: (formData) => api.post("/items/import", formData),
   get: (id) => api.get(`/items/${id}`),
   update: (id, data) => api.patch(`/items/${id}`, data),
   delete: (id) => api.delete(`/items/${id}`),
@@ -27,26 +29,55 @@ export const itemsApi = {
 };
 
 export const groupsApi = {
-  list: () => api.get("/groups"),
+  list: (params) => api.get("/groups", { params }),
   create: (data) => api.post("/groups", data),
   get: (id) => api.get(`/groups/${id}`),
   update: (id, data) => api.patch(`/groups/${id}`, data),
   delete: (id) => api.delete(`/groups/${id}`),
   listMembers: (id) => api.get(`/groups/${id}/members`),
+  listItems: (id, params) => api.get(`/groups/${id}/items`, { params }),
+  listPlans: (id, params) => api.get(`/groups/${id}/plans`, { params }),
   addMember: (id, data) => api.post(`/groups/${id}/members`, data),
   removeMember: (id, userId) => api.delete(`/groups/${id}/members/${userId}`),
 };
 
 export const plansApi = {
-  list: () => api.get("/plans"),
+  list: (params) => api.get("/plans", { params }),
   create: (data) => api.post("/plans", data),
   get: (id) => api.get(`/plans/${id}`),
+  detail: (id) => api.get(`/plans/${id}/detail`),
   update: (id, data) => api.patch(`/plans/${id}`, data),
   delete: (id) => api.delete(`/plans/${id}`),
   toggleItem: (id, piId, data) => api.patch(`/plans/${id}/items/${piId}`, data),
   complete: (id) => api.post(`/plans/${id}/complete`),
+  addSuggestions: (id, data) => api.post(`/plans/${id}/suggestions`, data),
   records: (id) => api.get(`/plans/${id}/records`),
   listShares: (id) => api.get(`/plans/${id}/shares`),
   share: (id, data) => api.post(`/plans/${id}/shares`, data),
   revokeShare: (id, shareId) => api.delete(`/plans/${id}/shares/${shareId}`),
 };
+
+export const planTemplatesApi = {
+  list: () => api.get("/plan-templates"),
+  create: (data) => api.post("/plan-templates", data),
+  update: (id, data) => api.patch(`/plan-templates/${id}`, data),
+  delete: (id) => api.delete(`/plan-templates/${id}`),
+  instantiate: (id, data = {}) => api.post(`/plan-templates/${id}/instantiate`, data),
+};
+
+export const recordsApi = {
+  export: (params) => api.get("/records/export", { params, responseType: "blob" }),
+};
+
+export const suggestionsApi = {
+  list: (params) => api.get("/suggestions", { params }),
+};
+
+export const syncApi = {
+  batch: (operations, idempotencyKey) =>
+    api.post(
+      "/sync/batch",
+      { operations },
+      idempotencyKey ? { headers: { "Idempotency-Key": idempotencyKey } } : {}
+    ),
+};